@@ -1,728 +1,668 @@
-import os
+import atexit
+import asyncio
+import hashlib
 import logging
+import logging.handlers
+import queue
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from pathlib import Path
+from string import Template
 from textwrap import dedent
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from fastapi import FastAPI, HTTPException
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Annotated, Any
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints, model_validator
 from agno.agent import Agent
 from agno.models.openai import OpenAIChat
+from agno.run.agent import RunContentEvent, RunErrorEvent, RunStatus
 from agno.tools.mcp import MCPTools
-from dotenv import load_dotenv
+from cachetools import TTLCache
+import orjson
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
-logging.basicConfig(level=logging.INFO)
+# Log calls only enqueue records; the blocking stderr writes happen on the listener thread
+log_queue: queue.SimpleQueue = queue.SimpleQueue()
+log_listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler())
+log_listener.start()
+atexit.register(log_listener.stop)
+logging.basicConfig(level=logging.INFO, handlers=[logging.handlers.QueueHandler(log_queue)])
 logger = logging.getLogger(__name__)
-load_dotenv()
 
-app = FastAPI()
+
+class Settings(BaseSettings):
+    """Environment configuration, validated once at import so misconfiguration fails before the server binds"""
+    # .env next to app.py, wherever the server is started from
+    model_config = SettingsConfigDict(env_file=Path(__file__).with_name(".env"), extra="ignore")
+
+    openai_api_key: str
+    mdb_mcp_connection_string: str | None = None
+    # URLs of shared MCP sidecars; when unset each worker spawns its own npx subprocess
+    mdb_mcp_url: str | None = None
+    chart_mcp_url: str | None = None
+    # agno debug output traces every run and tool call, so it is opt-in (AGENT_DEBUG=1)
+    agent_debug: bool = False
+
+    @model_validator(mode="after")
+    def require_mongo_source(self):
+        if not self.mdb_mcp_connection_string and not self.mdb_mcp_url:
+            raise ValueError("Set MDB_MCP_CONNECTION_STRING or MDB_MCP_URL")
+        return self
+
+
+settings = Settings()
 
 mcp_tools: MCPTools | None = None
 chart_tools: MCPTools | None = None
+# Single Agent built in lifespan and shared by every handler.
+# DO NOT reconstruct — 50ms Pydantic schema revalidation per call
 agent: Agent | None = None
 
-# Allow frontend to access backend
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# Strong references to fire-and-forget tasks so they are not garbage collected
+background_tasks: set[asyncio.Task] = set()
+
+# Recent agent replies keyed by normalized query, so repeated questions skip the agent
+response_cache: TTLCache = TTLCache(maxsize=512, ttl=300)
+
+# Chart data keyed by (query, chartType), cleared whenever a dashboard command may change the data.
+# The per-key locks let concurrent requests for the same chart share one agent run.
+chart_data_cache: TTLCache = TTLCache(maxsize=512, ttl=300)
+chart_data_locks: TTLCache = TTLCache(maxsize=512, ttl=300)
+
+# Max batched agent runs in flight at once, to avoid overloading the MongoDB MCP subprocess
+BATCH_CONCURRENCY = 8
+batch_semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+# Request payloads are truncated to this many characters in log lines
+LOG_PREVIEW_CHARS = 200
+
+# Per-call cap on an agent run, well below the MCP subprocess timeout
+AGENT_TIMEOUT_SECONDS = 60
+
+# How often the MCP servers are pinged, and how long a ping may take
+MCP_HEALTH_INTERVAL_SECONDS = 15
+MCP_PING_TIMEOUT_SECONDS = 5
+
+# Keep a few driver connections open so the first queries skip TLS + auth
+MONGO_POOL_OPTIONS = {"minPoolSize": "5", "maxPoolSize": "20"}
+
+# CORS headers that do not depend on the request, encoded once instead of per request.
+# Credentials are allowed, so the origin is echoed back rather than sent as "*".
+CORS_HEADERS = [
+    (b"access-control-allow-credentials", b"true"),
+    (b"vary", b"Origin"),
+]
+PREFLIGHT_HEADERS = [
+    (b"access-control-allow-methods", b"DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"),
+    (b"access-control-max-age", b"600"),
+    (b"content-length", b"0"),
+]
+
+
+class FastCORS:
+    """
+    Pure ASGI CORS middleware, allowing any origin with credentials
+    Injects the allow headers into http.response.start and answers preflight
+    requests directly, without buffering the response body
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        origin = headers.get(b"origin")
+        # Not a cross-origin request
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+
+        cors_headers = [(b"access-control-allow-origin", origin)] + CORS_HEADERS
+
+        if scope["method"] == "OPTIONS" and b"access-control-request-method" in headers:
+            preflight_headers = cors_headers + PREFLIGHT_HEADERS
+            requested_headers = headers.get(b"access-control-request-headers")
+            if requested_headers:
+                preflight_headers.append((b"access-control-allow-headers", requested_headers))
+            await send({"type": "http.response.start", "status": 204, "headers": preflight_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_cors(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + cors_headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
+
+
+class CircuitBreaker:
+    """
+    Fast-fails agent calls after repeated errors
+    Opens after `threshold` failures within `window` seconds and stays open for `cooldown` seconds
+    """
+
+    def __init__(self, threshold: int, window: float, cooldown: float):
+        self.threshold = threshold
+        self.window = window
+        self.cooldown = cooldown
+        self.failures: deque[float] = deque()
+        self.opened_at: float | None = None
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            self.opened_at = None
+            self.failures.clear()
+            return True
+        return False
+
+    def record_success(self):
+        self.failures.clear()
+
+    def record_failure(self):
+        now = time.monotonic()
+        self.failures.append(now)
+        while self.failures and now - self.failures[0] > self.window:
+            self.failures.popleft()
+        if len(self.failures) >= self.threshold:
+            logger.error("Circuit opened after %d agent failures", len(self.failures))
+            self.opened_at = now
+
+
+agent_breaker = CircuitBreaker(threshold=5, window=30, cooldown=10)
+
+
+# Over-long inputs are rejected before they reach the LLM
+UserText = Annotated[str, StringConstraints(max_length=8192)]
+# Names, ids, titles and chart types
+ShortText = Annotated[str, StringConstraints(max_length=256)]
+# Bounds on the dashboard state echoed into command prompts
+MAX_DASHBOARD_CHARTS = 50
+MAX_CHART_POINTS = 1000
+
+# Request bodies are read-only and must not carry unknown fields
+REQUEST_CONFIG = ConfigDict(extra="forbid", frozen=True, str_strip_whitespace=False)
 
 class ChatRequest(BaseModel):
-    message: str
+    model_config = REQUEST_CONFIG
+
+    message: UserText
+
+class ChatBatchRequest(BaseModel):
+    model_config = REQUEST_CONFIG
+
+    messages: Annotated[list[UserText], Field(max_length=32)]
 
 class DashboardGenerateRequest(BaseModel):
-    query: str
+    model_config = REQUEST_CONFIG
+
+    query: UserText
+
+class ChartSpec(BaseModel):
+    """One chart as held in the frontend dashboard store (utils/chartDataParser.js)"""
+    model_config = ConfigDict(extra="ignore")
+
+    id: ShortText | None = None
+    type: ShortText | None = None
+    title: ShortText | None = None
+    # Usually a list of {"name", "value"} points, but any agent-produced JSON is kept
+    data: (
+        Annotated[list[Any], Field(max_length=MAX_CHART_POINTS)]
+        | Annotated[dict[str, Any], Field(max_length=MAX_CHART_POINTS)]
+        | None
+    ) = None
+    # Grid placement {x, y, w, h}, display toggles, and colors; commands like
+    # "make it bigger" or "change colors" are answered from these
+    position: dict[str, Any] | None = None
+    options: dict[str, Any] | None = None
+    style: dict[str, Any] | None = None
+    config: dict[str, Any] | None = None
+
+class LayoutItem(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    i: ShortText
+    x: int = 0
+    y: int = 0
+    w: int = 1
+    h: int = 1
+
+class DashboardState(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    charts: Annotated[list[ChartSpec], Field(max_length=MAX_DASHBOARD_CHARTS)] = []
+    layout: Annotated[list[LayoutItem], Field(max_length=MAX_DASHBOARD_CHARTS)] = []
+    dashboardTitle: ShortText | None = None
 
 class DashboardCommandRequest(BaseModel):
-    command: str
-    currentDashboard: dict = None
+    model_config = REQUEST_CONFIG
+
+    command: UserText
+    currentDashboard: DashboardState | None = None
 
 class ChartDataRequest(BaseModel):
-    query: str
-    chartType: str = None
+    model_config = REQUEST_CONFIG
 
+    query: UserText
+    chartType: ShortText | None = None
 
-@app.on_event("startup")
-async def startup_event():
-    global mcp_tools, chart_tools, agent
 
-    logger.info("App startup: initializing MCPTools and Agent")
+# System prompt is built once at import and kept byte-identical across requests,
+# so it forms a stable prefix that OpenAI's automatic prompt caching can reuse.
+# Long playbooks live in the guides below and are only fetched by the agent on demand.
+SYSTEM_INSTRUCTIONS: str = dedent(
+    """
+    You are an intelligent MongoDB analytics assistant with adaptive exploration capabilities.
 
-    # Connection string with a safe default (similar to example script)
-    connection_string = os.getenv(
-        "MDB_MCP_CONNECTION_STRING"
-    )
+    WORKFLOW - Follow these steps SYSTEMATICALLY for EVERY query:
+    1. **Discover**: List ALL databases (the largest usually holds the main data), then ALL collections in it.
+    2. **Sample**: Read 5-10 documents from EACH relevant collection. Note exact field names and
+       capitalization, data types (string, number, ObjectId, date), nested objects ("balance.amount"),
+       arrays, and reference fields ending in Id (companyId, businessId, contactId, userId, ...).
+    3. **Verify**: Run countDocuments() before ever claiming a collection is empty.
+    4. **Query**: Use EXACT field names from the samples. Use case-insensitive regex for text
+       ({field: {$regex: "term", $options: "i"}}). Build queries incrementally.
+    5. **Follow relationships**: Find the entity in its primary collection, take its _id, then query
+       related collections by the reference field. Combine everything into one answer.
+    6. **Validate**: If results are empty, re-check field names, types (ObjectId vs string) and try
+       broader or partial matches, other name fields (name, businessName, companyName, title,
+       company.name) and other collections.
+    7. **Present** the results clearly with context.
 
-    # MongoDB MCP Tools
-    mcp_tools = MCPTools(
-        command="npx -y mongodb-mcp-server@latest",
-        env={"MDB_MCP_CONNECTION_STRING": connection_string},
-        timeout_seconds=120,
-    )
-    logger.info("Connecting MongoDB MCP server at startup...")
-    await mcp_tools.connect()
-    logger.info("MongoDB MCP server connected at startup")
-    
-    # Chart MCP Tools for data visualization
-    chart_tools = MCPTools(
-        command="npx -y @antv/mcp-server-chart",
-        timeout_seconds=60,
-    )
-    logger.info("Connecting Chart MCP server at startup...")
-    await chart_tools.connect()
-    logger.info("Chart MCP server connected at startup")
+    CRITICAL RULES - NEVER BREAK THESE:
+    ❌ NEVER assume database, collection or field names - list and sample first
+    ❌ NEVER say "collection doesn't exist" without listing all collections
+    ❌ NEVER say "collection is empty" without running countDocuments()
+    ❌ NEVER say "no related records" without querying the related collections
+    ❌ NEVER give up after one attempt - try at least 3-5 different approaches
+    ✅ ALWAYS verify your assumptions by actually querying the data
+    ✅ ALWAYS follow ID references to related collections
+    ✅ If a query times out, retry with a smaller limit or a simpler query
 
-    agent = Agent(
-        name="Intelligent MongoDB Analytics Assistant",
-        model=OpenAIChat(id="gpt-4.1-mini-2025-04-14"),
-        tools=[mcp_tools, chart_tools],
-        instructions=dedent(
-        """
-        You are an intelligent MongoDB analytics assistant with adaptive exploration capabilities.
-
-        WORKFLOW - Follow these steps SYSTEMATICALLY for EVERY query:
-
-        1. **Discover ALL Databases**: 
-           - List ALL available databases without exception
-           - Note the size of each database - larger ones contain main data
-           
-        2. **Explore ALL Collections**:
-           - For the largest database, list ALL collections
-           - Pay attention to collection names - they indicate data type (Business, Contact, Voucher, etc.)
-           
-        3. **Deep Document Inspection** (MOST CRITICAL STEP):
-           - Sample 5-10 documents from EACH relevant collection
-           - For EACH document, examine:
-             * All field names (exact spelling, capitalization)
-             * Data types (string, number, ObjectId, date, array, nested object)
-             * Nested objects and their fields
-             * Array structures and what they contain
-             * Reference fields (fields ending in Id, like companyId, businessId, contactId)
-           - Create a mental schema map of how collections relate to each other
-           
-        4. **Verify Data Existence**:
-           - Count total documents in collection: db.collection.countDocuments({})
-           - NEVER claim empty without running actual count query
-           - If count shows documents exist, they EXIST - find them!
-           
-        5. **Construct Smart Queries**:
-           - Use EXACT field names from sampled documents (not guessed)
-           - For references, follow the trail (if doc has companyId, search Business collection by _id)
-           - Build queries incrementally: start simple, add filters step by step
-           
-        6. **Execute & Validate**:
-           - Run query and check results
-           - If empty, verify you used correct field names from samples
-           - Try variations (case-insensitive, partial match, broader criteria)
-           
-        7. **Present Results**: Format clearly with context
-        
-        CRITICAL RULES - NEVER BREAK THESE:
-        ❌ NEVER skip document sampling - it's the most important step
-        ❌ NEVER say "collection doesn't exist" without listing all collections
-        ❌ NEVER say "collection is empty" without running countDocuments()
-        ❌ NEVER guess field names - always use exact names from sampled documents
-        ❌ NEVER give up after one attempt - try at least 5 different approaches
-        ❌ NEVER ignore reference fields (companyId, businessId, etc.) - they link data together
-        ✅ ALWAYS sample enough documents to understand the schema (5-10 docs minimum)
-        ✅ ALWAYS verify your assumptions by actually querying the data
-        ✅ ALWAYS follow ID references to related collections
-
-        KEY PRINCIPLES:
-        
-        **Be Methodical, Not Assumptive:**
-        - NEVER assume database names - list them all first
-        - NEVER assume collection names - list them all
-        - NEVER assume field names - sample documents and see actual field names
-        - NEVER assume data types - check what type each field actually is
-        - NEVER assume relationships - look for reference fields in sampled docs
-        
-        **Learn from Data, Don't Guess:**
-        - Each sampled document is a learning opportunity - study it carefully
-        - If you see "businessId" in 5 Contact documents, that's the pattern - use it!
-        - If company name is in "name" field (not "companyName"), use "name"
-        - If balance is nested {"balance": {"amount": 5000}}, use "balance.amount"
-        - Build your mental schema from ACTUAL data, not assumptions
-        
-        **Be Thorough:**
-        - Sample 5-10 docs minimum (not just 1-2)
-        - Check multiple collections (not just one)
-        - Try multiple query variations (not just one attempt)
-        - Follow ALL reference trails (don't stop at first collection)
-        
-        **Context & Quality:**
-        - Provide context: explain what you found and how you analyzed it
-        - Include relevant statistics, trends, and comparisons
-        - Format responses with clear headings, tables, and bullet points
-        - Double-check your query uses exact field names from samples before executing
-        
-        SCHEMA UNDERSTANDING - THE FOUNDATION OF ACCURACY:
-        
-        When you sample documents, build a complete mental map:
-        
-        **Document Structure Analysis:**
-        - Write down EVERY field name you see (exact capitalization matters!)
-        - Note which fields are:
-          * Simple values (string, number, boolean, date)
-          * ObjectIds (usually named _id, or ending in Id like companyId)
-          * Nested objects (e.g., {address: {street, city, zip}})
-          * Arrays (e.g., tags: ["tag1", "tag2"] or items: [{}, {}])
-        
-        **Reference Field Detection (CRITICAL for compound queries):**
-        Look for fields that reference other collections:
-        - companyId → points to Business/Company collection's _id
-        - businessId → points to Business collection's _id  
-        - contactId → points to Contact collection's _id
-        - userId → points to User collection's _id
-        - customerId, orderId, productId, etc.
-        
-        When you find a reference field, make a note: 
-        "Contact collection has businessId field → links to Business._id"
-        
-        **Nested Data Handling:**
-        Example: {company: {name: "Dipshi", type: "retail"}, balance: 5000}
-        - Access nested field: "company.name" not just "name"
-        - Query: {$or: [{"company.name": {$regex: "Dipshi", $options: "i"}}, {name: {$regex: "Dipshi", $options: "i"}}]}
-        
-        MONGODB QUERY BEST PRACTICES:
-        
-        **Understanding document structure:**
-        - Sample at least 5-10 documents to see variations in schema
-        - Some documents may have different fields - check multiple samples
-        - Check if names/identifiers are in single or multiple fields
-        - Look for common patterns: createdAt, updatedAt, isActive, status fields
-        
-        **For text searches:**
-        - Use case-insensitive regex: {fieldName: {$regex: "searchTerm", $options: "i"}}
-        - For exact matches: {fieldName: {$regex: "^exactValue$", $options: "i"}}
-        - For partial matches: {fieldName: {$regex: "partialValue", $options: "i"}}
-        - Try variations if first attempt fails (different casing, partial terms)
-        
-        **Understanding user queries:**
-        - Map natural language to actual database fields
-        - "all items with [property]" = filter by that property field
-        - "find [entity] by [attribute]" = query the collection using that attribute
-        - "how many [entities]" = count documents with optional filters
-        
-        **General search strategy:**
-        1. First, sample 3-5 documents from EVERY relevant collection to see exact field names
-        2. Then construct your query based on actual field structure (not assumptions)
-        3. Use case-insensitive matching for text searches
-        4. If no results, try broader queries (remove some conditions, try partial matches)
-        5. If still no results, check OTHER collections - data might be organized differently
-        6. NEVER claim data doesn't exist until you've checked ALL collections in ALL databases
-        
-        **When user asks about a specific entity (company, person, item):**
-        1. List ALL databases first to see what's available
-        2. Check the LARGEST database (biggest size) first - that's usually where main data lives
-        3. List ALL collections in that database
-        4. Sample documents from collections with relevant names (Business, Company, Contact, etc.)
-        5. Look for name/identifier fields in the sampled documents
-        6. Search using the EXACT field names you discovered (not guessed ones)
-        7. If searching by company name: try "name", "companyName", "businessName", "title" fields
-        8. Use regex with case-insensitive matching for text searches
-
-        ANALYSIS APPROACH:
-        - Start broad (list ALL databases) → explore thoroughly (ALL collections) → dive deep (query with actual field names)
-        - Look for relationships between collections (common fields like IDs, foreign keys)
-        - Identify time-series data (date/timestamp fields) for trend analysis
-        - Recognize categorical data (status, type, category fields) for grouping
-        - Calculate meaningful metrics (averages, totals, counts, percentages, rankings)
-        - When looking for business/financial data: check collections like Business, Contact, Account, Voucher, etc.
-        
-        CRITICAL - FOLLOW DATA RELATIONSHIPS:
-        When a user asks about a specific entity:
-        1. First, find the entity in its primary collection to get its ID
-        2. Then, use that ID to search OTHER related collections
-        3. Look for fields that reference this ID (e.g., userId, orderId, customerId, etc.)
-        4. Combine ALL related data into a comprehensive answer
-        5. Never stop after finding just the primary record - always follow the relationships
-        
-        Example workflow for "Show me details about [Entity X]":
-        Step 1: Query primary collection → get entity_id
-        Step 2: Query related collections where entity_id matches → get associated data
-        Step 3: If there are nested relationships, follow those too
-        Step 4: Present all related data together in a comprehensive report
-
-        RESPONSE FORMAT (ChatGPT-style conversational):
-        - Write in a **natural, conversational tone** like you're explaining to a colleague.
-        - Start with a brief intro sentence that directly answers the question.
-        - Use clean, minimal formatting:
-          - Use **bold** for important values, names, and key terms (not for entire sentences)
-          - Use simple bullet points (•) for lists
-          - Use clear section breaks with simple headings
-          - Avoid excessive markdown symbols (###, **, etc.)
-        
-        Structure your response like this:
-        
-        1. **Opening statement** (1-2 sentences directly answering the query)
-        
-        2. **Main information** organized in logical sections:
-           - For entity info: Basic Details → Related Data → Aggregated Metrics
-           - For database info: What it contains → Collections → Use cases
-           - For analysis: Key findings → Supporting data → Insights
-        
-        3. **Present data clearly**:
-           - Use natural language to describe findings
-           - Group related info together
-           - Use tables when comparing multiple items
-           - Show the most important info first
-        
-        4. **End with context or next steps** (optional)
-        
-        Writing style:
-        - Conversational and friendly, not robotic
-        - Short paragraphs (2-3 lines max)
-        - Explain technical terms in plain English
-        - Focus on what matters to the user
-        - Don't repeat the same info in different sections
-
-        WRITE OPERATIONS:
-        - Always confirm before any write/delete/update operations
-        - Explain exactly what will change
-        - Suggest safer alternatives when appropriate
-
-        SPECIAL CASE - COMPOUND QUERIES (e.g., "parties in Company X with condition"):
-        
-        Example: "How many parties in Dipshi company have balance > INR 5000?"
-        
-        This requires MULTI-STEP reasoning:
-        
-        **Step 1: Understand what user is asking**
-        - They want: COUNT of parties
-        - Filter 1: linked to company "Dipshi"  
-        - Filter 2: balance > 5000
-        
-        **Step 2: Map to database structure**
-        A. List databases → Find largest (dev-cluster: 7GB = main data)
-        B. List collections → See Business, Contact, BusinessContact, etc.
-        C. Sample Business collection (5-10 docs) → See fields: _id, name, type, etc.
-        D. Sample Contact collection (5-10 docs) → See fields: _id, name, businessId, balance, etc.
-        E. CRITICAL: Notice Contact has "businessId" field - this links to Business!
-        
-        **Step 3: Execute compound query**
-        Query 1: Find company in Business collection
-          {name: {$regex: "Dipshi", $options: "i"}}
-          → Get result with _id: "abc123"
-        
-        Query 2: Find parties in Contact collection
-          {businessId: "abc123", balance: {$gt: 5000}}
-          → Count results
-        
-        **Step 4: Handle variations**
-        If Query 1 fails (no company found):
-        - Try other name fields: businessName, companyName, title
-        - Try nested: {"company.name": {$regex: "Dipshi", $options: "i"}}
-        - Check other collections: BusinessContact, ICompany, company_data
-        - Try partial match: {$regex: "Dip", $options: "i"}
-        
-        If Query 2 fails (no parties found):
-        - Verify businessId is correct reference field (check sampled docs)
-        - Try variations: companyId, company_id, business_id
-        - Check if balance field exists (look at sampled docs)
-        - Try nested balance: {"balance.amount": {$gt: 5000}}
-        
-        CRITICAL SUCCESS FACTORS:
-        ✅ Sample BOTH collections (Business AND Contact) to see exact field names
-        ✅ Verify the reference field name from actual documents (businessId vs companyId)
-        ✅ Use the actual _id value from Business query in Contact query
-        ✅ Check if balance is a number field or nested object
-        ✅ Try multiple variations before giving up
-
-        IMPORTANT - HIDE YOUR WORK:
-        - Do NOT show the user your discovery process (listing databases, exploring collections, etc.)
-        - Only show the FINAL ANSWER to their question
-        - Your exploration steps should happen silently in the background
-        - The user should only see the clean, final result
-        - Exception: If you truly cannot find the data after exhaustive search, explain what you tried
-        
-        HANDLING FOLLOW-UP QUERIES:
-        - If the user asks about a specific item you just showed them, 
-          that item DEFINITELY EXISTS in the database - you just listed it!
-        - Use the SAME database and collection you used before
-        - Parse the query to identify the key fields to search on
-        - Use case-insensitive matching as shown in SEARCH BEST PRACTICES above
-        - Never say "I can't find it" without trying multiple search approaches first
-        - If truly stuck, show the user what query you tried so they can help debug
-        
-        IMPORTANT - NO LAZY ANSWERS:
-        - NEVER say "collection is empty" or "no documents present" without running an actual count query
-        - NEVER say "no related records found" without actually querying related collections
-        - NEVER say "no data available" after only checking one collection
-        - NEVER say "collection doesn't exist" without listing ALL collections in the database first
-        - Always follow the relationship chain using IDs found in documents
-        - If you found a primary entity, you MUST search related collections for associated data
-        - If a query times out or fails, try with a smaller limit or simpler query
-        - Be PERSISTENT: try at least 3-4 different approaches before giving up
-        
-        **When you encounter obstacles:**
-        - Timeout error → Try querying with smaller limits (e.g., limit: 10 instead of 100)
-        - No results → Check if you're using the correct field names from sampled documents
-        - Can't find collection → List ALL collections again to verify the exact name
-        - Empty result → Try broader search criteria (remove filters, use partial matching)
-        - Don't know field name → Sample MORE documents from the collection
-        
-        **TROUBLESHOOTING CHECKLIST - Use this when query fails:**
-        
-        Problem: "Can't find company/entity"
-        □ Did you list ALL collections? (not just assumed ones)
-        □ Did you sample 5-10 docs from Business/Company collections?
-        □ Did you check ALL possible name fields? (name, businessName, companyName, title, company.name)
-        □ Did you use case-insensitive search? ($regex with $options: "i")
-        □ Did you try partial matching? (remove ^ and $ from regex)
-        □ Did you check other collections? (BusinessContact, ICompany, company_data)
-        
-        Problem: "Collection is empty"
-        □ Did you run countDocuments() to verify it's actually empty?
-        □ If count > 0 but find() returns nothing, try with no filter: find({})
-        □ Did you check if you're using correct collection name (exact spelling)?
-        
-        Problem: "No parties found for company"
-        □ Did you actually GET the company _id from first query?
-        □ Did you check sampled Contact/Party docs to see reference field name?
-        □ Are you using the EXACT reference field? (businessId vs companyId vs company_id)
-        □ Did you use ObjectId() wrapper if needed? {businessId: ObjectId("abc123")}
-        □ Did you verify the _id format (ObjectId vs string)?
-        
-        Problem: "Query timed out"
-        □ Reduce limit to 5-10 docs instead of 100+
-        □ Simplify query - remove some filters
-        □ Try aggregation with $limit stage early: [{$limit: 10}, {$match: {...}}]
-        
-        **Query Validation Before Execution:**
-        Before running ANY query, ask yourself:
-        1. Did I sample documents to see this field exists? ✓
-        2. Am I using the EXACT field name from samples? ✓
-        3. Is my data type correct (string vs ObjectId vs number)? ✓
-        4. If using references, did I verify the reference field name? ✓
-        
-        **Before asking the user for help:**
-        You MUST have attempted ALL of these:
-        1. ✓ Listed all databases
-        2. ✓ Listed all collections in the relevant database(s) 
-        3. ✓ Sampled 5-10 documents from at least 3-5 relevant collections
-        4. ✓ Tried searching with exact field names discovered in samples
-        5. ✓ Tried case-insensitive regex matching
-        6. ✓ Tried partial/broader search criteria (removed some filters)
-        7. ✓ Checked related collections for the data
-        8. ✓ Verified reference fields from sampled documents
-        9. ✓ Tried nested field access (e.g., "company.name")
-        10. ✓ Checked ObjectId vs string format for _id fields
-        
-        Only after exhausting ALL these steps should you ask the user for clarification.
-        
-        DATA VISUALIZATION WITH CHARTS:
-        You have access to chart generation tools. Use them when appropriate to visualize data:
-        
-        **When to generate charts:**
-        - Comparing values across categories (e.g., counts by type → bar chart)
-        - Showing trends over time (e.g., metrics over months → line chart)
-        - Displaying proportions (e.g., distribution by category → pie chart)
-        - Analyzing distributions (e.g., value ranges → histogram)
-        - Showing correlations (e.g., relationship between two metrics → scatter plot)
-        
-        **Available chart types:**
-        - Bar charts: comparing categories (generate_bar_chart)
-        - Line charts: trends over time (generate_line_chart)
-        - Pie charts: proportions/percentages (generate_pie_chart)
-        - Scatter plots: correlations (generate_scatter_chart)
-        - Heatmaps: matrix data (generate_heatmap)
-        - Area charts: cumulative trends (generate_area_chart)
-        
-        **How to use charts:**
-        1. After querying data, decide if a chart would help visualize it
-        2. Transform the data into the required format (x/y values, labels, series)
-        3. Call the appropriate chart tool with the data
-        4. The tool returns an image URL - include it in your response
-        5. Add a brief explanation of what the chart shows
-        
-        **Chart response format:**
-        CRITICAL: When you generate a chart, you MUST format the image URL as a Markdown image.
-        
-        ✅ CORRECT FORMAT:
-        ```
-        [Brief text explanation of findings]
-        
-        ![Chart Title](https://chart-url.com/image.png)
-        
-        [Additional insights from the data]
-        ```
-        
-        ❌ WRONG - DO NOT just paste the URL as plain text:
-        ```
-        Here's the chart: [https://chart-url.com/image.png](https://chart-url.com/image.png)
-        ```
-        
-        Example: "Here's the distribution across categories:"
-        ![Category Distribution](https://mdn.alipayobjects.com/chart.png)
-        "Most items fall into the first three categories, with significant variation."
-        
-        REMEMBER: Always use ![alt text](url) format for chart URLs!
-        
-        ═══════════════════════════════════════════════════════════════════════
-        FORMULA FOR SUCCESS - Follow this to guarantee accurate results:
-        ═══════════════════════════════════════════════════════════════════════
-        
-        1. DISCOVER EVERYTHING FIRST
-           ↓ List ALL databases (not just some)
-           ↓ List ALL collections in main database (not just assumed ones)
-           ↓ Don't skip this - it's your foundation
-        
-        2. SAMPLE DEEPLY (5-10 documents per collection)
-           ↓ Look at actual field names
-           ↓ Note reference fields (businessId, companyId, etc.)
-           ↓ Check nested structures
-           ↓ Build mental schema map
-        
-        3. QUERY SMARTLY
-           ↓ Use EXACT field names from samples
-           ↓ Use case-insensitive regex for text
-           ↓ Follow reference chains (if Contact has businessId, query Business by _id)
-           ↓ Validate each query uses real field names
-        
-        4. PERSIST THROUGH OBSTACLES
-           ↓ No results? Try broader criteria
-           ↓ Timeout? Use smaller limits
-           ↓ Wrong field? Re-sample documents
-           ↓ Try 5+ variations before asking for help
-        
-        5. VERIFY BEFORE CONCLUDING
-           ✓ If you claim collection is empty → You ran countDocuments()
-           ✓ If you claim company doesn't exist → You sampled Business collection
-           ✓ If you claim no parties found → You verified reference field from samples
-           ✓ If you're stuck → You tried all 10 troubleshooting steps
-        
-        GOLDEN RULE: Let the DATA teach you the schema - don't assume you know it!
-        
-        ═══════════════════════════════════════════════════════════════════════
-        INTERACTIVE DASHBOARD GENERATION - Advanced Analytics Platform:
-        ═══════════════════════════════════════════════════════════════════════
-        
-        When user requests a dashboard or wants to create visualizations:
-        
-        **STEP 1: INTELLIGENT DATA ANALYSIS**
-        - Explore the database thoroughly (all collections)
-        - Identify key metrics (counts, sums, averages, trends)
-        - Detect time-series data (date/timestamp fields)
-        - Find categorical distributions (status, type, category fields)
-        - Spot relationships between collections (foreign keys)
-        
-        **STEP 2: SMART CHART SELECTION**
-        Choose the BEST chart type for each insight:
-        
-        • **Bar Chart**: Comparisons across categories, rankings, top N lists
-        • **Line Chart**: Trends over time, continuous data, time-series
-        • **Pie Chart**: Proportions (use only for 2-7 categories)
-        • **Area Chart**: Cumulative trends, volume over time, stacked data
-        • **Scatter Plot**: Correlation between two variables, clustering
-        • **Radar Chart**: Multi-dimensional comparisons, performance metrics
-        • **Heatmap**: Correlation matrices, density, pattern detection
-        • **Table**: Detailed data, lists, multiple attributes
-        • **Gauge**: KPIs, progress toward goals, single metrics
-        • **Funnel**: Conversion rates, sales pipeline, process stages
-        
-        **STEP 3: DATA FORMATTING**
-        Format data correctly for each chart type:
-        
-        ```
-        Bar/Line/Pie/Area Charts:
-        [
-          {"name": "Category A", "value": 150},
-          {"name": "Category B", "value": 200},
-          {"name": "Category C", "value": 120}
-        ]
-        
-        Scatter Plot:
-        [
-          {"x": 10, "y": 20, "name": "Point 1"},
-          {"x": 15, "y": 25, "name": "Point 2"}
-        ]
-        
-        Multi-series Charts:
-        [
-          {"name": "Jan", "sales": 100, "expenses": 80},
-          {"name": "Feb", "sales": 150, "expenses": 90}
-        ]
-        
-        Tables:
-        [
-          {"id": 1, "name": "Item A", "value": 100, "status": "Active"},
-          {"id": 2, "name": "Item B", "value": 200, "status": "Pending"}
-        ]
-        ```
-        
-        **STEP 4: DASHBOARD COMPOSITION**
-        Create a balanced dashboard with:
-        
-        1. **KPI Cards** (Top): 2-4 key metrics (totals, averages, growth rates)
-        2. **Primary Insights** (Middle): 2-3 main charts (trends, distributions)
-        3. **Supporting Details** (Bottom): Additional charts or tables
-        
-        **EXAMPLE DASHBOARD RESPONSE:**
-        
-        When user says "Create a dashboard for sales analysis":
-        
-        ```
-        I've analyzed your sales database and created an interactive dashboard with 5 visualizations:
-        
-        **📊 Sales Performance Dashboard**
-        
-        Based on the data in your database, here are the key insights:
-        
-        **1. Revenue Trend (Line Chart)**
-        - Shows monthly revenue for the past 12 months
-        - Trend: ↑ 23% growth in last quarter
-        - Data: 12 months of aggregated sales
-        
-        **2. Sales by Region (Bar Chart)**
-        - Compares performance across 5 regions
-        - Top: North Region (45% of total sales)
-        - Bottom: South Region (12% of total sales)
-        
-        **3. Product Category Distribution (Pie Chart)**
-        - Shows revenue breakdown by category
-        - Electronics: 35%, Fashion: 28%, Home: 20%, Other: 17%
-        
-        **4. Top 10 Products (Table)**
-        - Lists best-selling products with details
-        - Columns: Product Name, Units Sold, Revenue, Growth %
-        
-        **5. Customer Acquisition (Area Chart)**
-        - Cumulative customer count over time
-        - Total customers: 15,432 (↑ 18% vs last year)
-        
-        **Key Insights:**
-        • Revenue is trending upward with strong Q4 performance
-        • North region dominates but South region needs attention
-        • Electronics category drives the most revenue
-        • Top 3 products account for 40% of total sales
-        
-        You can now interact with these charts, resize them, change types, or ask me to modify any visualization!
-        ```
-        
-        **STEP 5: CONVERSATIONAL DASHBOARD EDITING**
-        
-        Support these commands:
-        
-        • "Add a chart showing [metric]" → Create new visualization
-        • "Change [chart] to [type]" → Convert chart type
-        • "Show [time period] in [chart]" → Update time range
-        • "Make [chart] bigger" → Resize chart
-        • "Remove [chart]" → Delete visualization
-        • "Show top 10 instead of top 5" → Update data limit
-        • "Change colors to [scheme]" → Update color scheme
-        • "Compare [metric1] vs [metric2]" → Create comparison chart
-        
-        **DASHBOARD GENERATION BEST PRACTICES:**
-        
-        ✅ Always query real data from MongoDB (don't use fake data)
-        ✅ Choose chart types that match the data structure
-        ✅ Provide context and insights with each chart
-        ✅ Format data correctly for the chosen chart type
-        ✅ Suggest interactive features (filters, drill-downs)
-        ✅ Highlight anomalies, trends, and key findings
-        ✅ Keep dashboards focused (5-8 charts maximum)
-        ✅ Use consistent color schemes across related charts
-        
-        ❌ Don't create charts without real data
-        ❌ Don't use pie charts for >7 categories
-        ❌ Don't overcrowd dashboards with too many charts
-        ❌ Don't ignore time-series data (always show trends)
-        ❌ Don't forget to aggregate data appropriately
-        
-        **ADVANCED ANALYTICS FEATURES:**
-        
-        When appropriate, include:
-        • Trend lines and moving averages
-        • Period comparisons (YoY, MoM, WoW)
-        • Growth rates and percentage changes
-        • Outlier detection and highlighting
-        • Predictive insights (based on historical patterns)
-        • Drill-down suggestions for deeper analysis
-        
-        Remember: You're a data explorer - discover the structure, understand the data, provide insights, and visualize when helpful!
-        """
-    ),
-    markdown=True,
-    debug_mode=True,
-)
-    logger.info("Intelligent MongoDB Analytics Assistant agent created at startup")
+    ON-DEMAND GUIDES - call these tools only when you need them:
+    • get_query_strategy_guide: multi-step/compound queries (e.g. "parties in Company X with balance > 5000")
+    • get_troubleshooting_guide: a query returned nothing, timed out, or an entity cannot be found -
+      call it BEFORE telling the user data does not exist or asking them for help
+    • get_dashboard_guide: the user asks to create or edit a dashboard
 
+    ANALYSIS APPROACH:
+    - Identify time-series fields for trends and categorical fields (status, type, category) for grouping
+    - Calculate meaningful metrics: totals, averages, counts, percentages, rankings, comparisons
 
-@app.on_event("shutdown")
-async def shutdown_event():
-    global mcp_tools, chart_tools
+    RESPONSE FORMAT (ChatGPT-style conversational):
+    - Natural, friendly tone, like explaining to a colleague. Short paragraphs (2-3 lines max).
+    - Open with 1-2 sentences that directly answer the question.
+    - Then organize the main information in logical sections (e.g. Basic Details → Related Data →
+      Aggregated Metrics, or Key findings → Supporting data → Insights), most important first.
+    - Use **bold** for key values and names only, simple bullet points (•), and tables when comparing items.
+    - Avoid excessive markdown symbols and don't repeat the same info in different sections.
+    - Optionally end with context or next steps.
 
-    if mcp_tools is not None:
-        logger.info("App shutdown: closing MongoDB MCP server...")
-        try:
-            await mcp_tools.close()
-            logger.info("MongoDB MCP server closed on shutdown")
-        except Exception:
-            logger.exception("Error while closing MongoDB MCP server on shutdown")
-    
-    if chart_tools is not None:
-        logger.info("App shutdown: closing Chart MCP server...")
-        try:
-            await chart_tools.close()
-            logger.info("Chart MCP server closed on shutdown")
-        except Exception:
-            logger.exception("Error while closing Chart MCP server on shutdown")
+    IMPORTANT - HIDE YOUR WORK:
+    - Do NOT show your discovery process (listing databases, exploring collections, etc.)
+    - Only show the clean FINAL ANSWER
+    - Exception: if you truly cannot find the data after exhaustive search, explain what you tried
 
+    HANDLING FOLLOW-UP QUERIES:
+    - An item you just showed the user DEFINITELY EXISTS - reuse the same database and collection
+    - Never say "I can't find it" without trying multiple search approaches first
 
-@app.get("/")
-async def root():
-    return {"status": "MongoDB MCP AI Backend is running!"}
+    WRITE OPERATIONS:
+    - Always confirm before any write/delete/update operation, explain exactly what will change,
+      and suggest safer alternatives when appropriate
 
-@app.post("/chat")
-async def chat(req: ChatRequest):
+    DATA VISUALIZATION WITH CHARTS:
+    Use the chart tools (generate_bar_chart, generate_line_chart, generate_pie_chart,
+    generate_scatter_chart, generate_heatmap, generate_area_chart, ...) when a chart helps:
+    comparisons across categories → bar, trends over time → line/area, proportions → pie,
+    correlations → scatter, matrix data → heatmap.
+    Transform the queried data into the tool's format, call the tool, and add a brief explanation.
 
-    logger.info("/chat called")
-    logger.info("Incoming message: %s", req.message)
+    CRITICAL: The chart tool returns an image URL - you MUST include it as a Markdown image:
+    ✅ ![Chart Title](https://chart-url.com/image.png)
+    ❌ Here's the chart: [https://chart-url.com/image.png](https://chart-url.com/image.png)
 
-    global agent
+    GOLDEN RULE: Let the DATA teach you the schema - don't assume you know it!
+    """
+)
 
-    if agent is None:
-        logger.error("Agent is not initialized")
-        return {"error": "Agent not initialized"}
+# On-demand guides, exposed to the agent through the get_*_guide tools
+QUERY_STRATEGY_GUIDE: str = dedent(
+    """
+    SPECIAL CASE - COMPOUND QUERIES (e.g., "parties in Company X with condition"):
+    
+    Example: "How many parties in Dipshi company have balance > INR 5000?"
+    
+    This requires MULTI-STEP reasoning:
+    
+    **Step 1: Understand what user is asking**
+    - They want: COUNT of parties
+    - Filter 1: linked to company "Dipshi"  
+    - Filter 2: balance > 5000
+    
+    **Step 2: Map to database structure**
+    A. List databases → Find largest (dev-cluster: 7GB = main data)
+    B. List collections → See Business, Contact, BusinessContact, etc.
+    C. Sample Business collection (5-10 docs) → See fields: _id, name, type, etc.
+    D. Sample Contact collection (5-10 docs) → See fields: _id, name, businessId, balance, etc.
+    E. CRITICAL: Notice Contact has "businessId" field - this links to Business!
+    
+    **Step 3: Execute compound query**
+    Query 1: Find company in Business collection
+      {name: {$regex: "Dipshi", $options: "i"}}
+      → Get result with _id: "abc123"
+    
+    Query 2: Find parties in Contact collection
+      {businessId: "abc123", balance: {$gt: 5000}}
+      → Count results
+    
+    **Step 4: Handle variations**
+    If Query 1 fails (no company found):
+    - Try other name fields: businessName, companyName, title
+    - Try nested: {"company.name": {$regex: "Dipshi", $options: "i"}}
+    - Check other collections: BusinessContact, ICompany, company_data
+    - Try partial match: {$regex: "Dip", $options: "i"}
+    
+    If Query 2 fails (no parties found):
+    - Verify businessId is correct reference field (check sampled docs)
+    - Try variations: companyId, company_id, business_id
+    - Check if balance field exists (look at sampled docs)
+    - Try nested balance: {"balance.amount": {$gt: 5000}}
+    
+    CRITICAL SUCCESS FACTORS:
+    ✅ Sample BOTH collections (Business AND Contact) to see exact field names
+    ✅ Verify the reference field name from actual documents (businessId vs companyId)
+    ✅ Use the actual _id value from Business query in Contact query
+    ✅ Check if balance is a number field or nested object
+    ✅ Try multiple variations before giving up
+    
+    ═══════════════════════════════════════════════════════════════════════
+    FORMULA FOR SUCCESS - Follow this to guarantee accurate results:
+    ═══════════════════════════════════════════════════════════════════════
+    
+    1. DISCOVER EVERYTHING FIRST
+       ↓ List ALL databases (not just some)
+       ↓ List ALL collections in main database (not just assumed ones)
+       ↓ Don't skip this - it's your foundation
+    
+    2. SAMPLE DEEPLY (5-10 documents per collection)
+       ↓ Look at actual field names
+       ↓ Note reference fields (businessId, companyId, etc.)
+       ↓ Check nested structures
+       ↓ Build mental schema map
+    
+    3. QUERY SMARTLY
+       ↓ Use EXACT field names from samples
+       ↓ Use case-insensitive regex for text
+       ↓ Follow reference chains (if Contact has businessId, query Business by _id)
+       ↓ Validate each query uses real field names
+    
+    4. PERSIST THROUGH OBSTACLES
+       ↓ No results? Try broader criteria
+       ↓ Timeout? Use smaller limits
+       ↓ Wrong field? Re-sample documents
+       ↓ Try 5+ variations before asking for help
+    
+    5. VERIFY BEFORE CONCLUDING
+       ✓ If you claim collection is empty → You ran countDocuments()
+       ✓ If you claim company doesn't exist → You sampled Business collection
+       ✓ If you claim no parties found → You verified reference field from samples
+       ✓ If you're stuck → You tried all 10 troubleshooting steps
+    
+    GOLDEN RULE: Let the DATA teach you the schema - don't assume you know it!
+    """
+)
 
-    # Run agent (async)
-    logger.info("Running agent.arun")
-    try:
-        output = await agent.arun(req.message)
-    except Exception:
-        logger.exception("Error while running agent.arun")
-        raise
+TROUBLESHOOTING_GUIDE: str = dedent(
+    """
+    **When you encounter obstacles:**
+    - Timeout error → Try querying with smaller limits (e.g., limit: 10 instead of 100)
+    - No results → Check if you're using the correct field names from sampled documents
+    - Can't find collection → List ALL collections again to verify the exact name
+    - Empty result → Try broader search criteria (remove filters, use partial matching)
+    - Don't know field name → Sample MORE documents from the collection
+    
+    **TROUBLESHOOTING CHECKLIST - Use this when query fails:**
+    
+    Problem: "Can't find company/entity"
+    □ Did you list ALL collections? (not just assumed ones)
+    □ Did you sample 5-10 docs from Business/Company collections?
+    □ Did you check ALL possible name fields? (name, businessName, companyName, title, company.name)
+    □ Did you use case-insensitive search? ($regex with $options: "i")
+    □ Did you try partial matching? (remove ^ and $ from regex)
+    □ Did you check other collections? (BusinessContact, ICompany, company_data)
+    
+    Problem: "Collection is empty"
+    □ Did you run countDocuments() to verify it's actually empty?
+    □ If count > 0 but find() returns nothing, try with no filter: find({})
+    □ Did you check if you're using correct collection name (exact spelling)?
+    
+    Problem: "No parties found for company"
+    □ Did you actually GET the company _id from first query?
+    □ Did you check sampled Contact/Party docs to see reference field name?
+    □ Are you using the EXACT reference field? (businessId vs companyId vs company_id)
+    □ Did you use ObjectId() wrapper if needed? {businessId: ObjectId("abc123")}
+    □ Did you verify the _id format (ObjectId vs string)?
+    
+    Problem: "Query timed out"
+    □ Reduce limit to 5-10 docs instead of 100+
+    □ Simplify query - remove some filters
+    □ Try aggregation with $limit stage early: [{$limit: 10}, {$match: {...}}]
+    
+    **Query Validation Before Execution:**
+    Before running ANY query, ask yourself:
+    1. Did I sample documents to see this field exists? ✓
+    2. Am I using the EXACT field name from samples? ✓
+    3. Is my data type correct (string vs ObjectId vs number)? ✓
+    4. If using references, did I verify the reference field name? ✓
+    
+    **Before asking the user for help:**
+    You MUST have attempted ALL of these:
+    1. ✓ Listed all databases
+    2. ✓ Listed all collections in the relevant database(s) 
+    3. ✓ Sampled 5-10 documents from at least 3-5 relevant collections
+    4. ✓ Tried searching with exact field names discovered in samples
+    5. ✓ Tried case-insensitive regex matching
+    6. ✓ Tried partial/broader search criteria (removed some filters)
+    7. ✓ Checked related collections for the data
+    8. ✓ Verified reference fields from sampled documents
+    9. ✓ Tried nested field access (e.g., "company.name")
+    10. ✓ Checked ObjectId vs string format for _id fields
+    
+    Only after exhausting ALL these steps should you ask the user for clarification.
+    """
+)
+
+DASHBOARD_GUIDE: str = dedent(
+    """
+    ═══════════════════════════════════════════════════════════════════════
+    INTERACTIVE DASHBOARD GENERATION - Advanced Analytics Platform:
+    ═══════════════════════════════════════════════════════════════════════
+    
+    When user requests a dashboard or wants to create visualizations:
+    
+    **STEP 1: INTELLIGENT DATA ANALYSIS**
+    - Explore the database thoroughly (all collections)
+    - Identify key metrics (counts, sums, averages, trends)
+    - Detect time-series data (date/timestamp fields)
+    - Find categorical distributions (status, type, category fields)
+    - Spot relationships between collections (foreign keys)
+    
+    **STEP 2: SMART CHART SELECTION**
+    Choose the BEST chart type for each insight:
+    
+    • **Bar Chart**: Comparisons across categories, rankings, top N lists
+    • **Line Chart**: Trends over time, continuous data, time-series
+    • **Pie Chart**: Proportions (use only for 2-7 categories)
+    • **Area Chart**: Cumulative trends, volume over time, stacked data
+    • **Scatter Plot**: Correlation between two variables, clustering
+    • **Radar Chart**: Multi-dimensional comparisons, performance metrics
+    • **Heatmap**: Correlation matrices, density, pattern detection
+    • **Table**: Detailed data, lists, multiple attributes
+    • **Gauge**: KPIs, progress toward goals, single metrics
+    • **Funnel**: Conversion rates, sales pipeline, process stages
+    
+    **STEP 3: DATA FORMATTING**
+    Format data correctly for each chart type:
+    
+    ```
+    Bar/Line/Pie/Area Charts:
+    [
+      {"name": "Category A", "value": 150},
+      {"name": "Category B", "value": 200},
+      {"name": "Category C", "value": 120}
+    ]
+    
+    Scatter Plot:
+    [
+      {"x": 10, "y": 20, "name": "Point 1"},
+      {"x": 15, "y": 25, "name": "Point 2"}
+    ]
+    
+    Multi-series Charts:
+    [
+      {"name": "Jan", "sales": 100, "expenses": 80},
+      {"name": "Feb", "sales": 150, "expenses": 90}
+    ]
+    
+    Tables:
+    [
+      {"id": 1, "name": "Item A", "value": 100, "status": "Active"},
+      {"id": 2, "name": "Item B", "value": 200, "status": "Pending"}
+    ]
+    ```
+    
+    **STEP 4: DASHBOARD COMPOSITION**
+    Create a balanced dashboard with:
+    
+    1. **KPI Cards** (Top): 2-4 key metrics (totals, averages, growth rates)
+    2. **Primary Insights** (Middle): 2-3 main charts (trends, distributions)
+    3. **Supporting Details** (Bottom): Additional charts or tables
+    
+    **EXAMPLE DASHBOARD RESPONSE:**
+    
+    When user says "Create a dashboard for sales analysis":
+    
+    ```
+    I've analyzed your sales database and created an interactive dashboard with 5 visualizations:
+    
+    **📊 Sales Performance Dashboard**
+    
+    Based on the data in your database, here are the key insights:
+    
+    **1. Revenue Trend (Line Chart)**
+    - Shows monthly revenue for the past 12 months
+    - Trend: ↑ 23% growth in last quarter
+    - Data: 12 months of aggregated sales
+    
+    **2. Sales by Region (Bar Chart)**
+    - Compares performance across 5 regions
+    - Top: North Region (45% of total sales)
+    - Bottom: South Region (12% of total sales)
+    
+    **3. Product Category Distribution (Pie Chart)**
+    - Shows revenue breakdown by category
+    - Electronics: 35%, Fashion: 28%, Home: 20%, Other: 17%
+    
+    **4. Top 10 Products (Table)**
+    - Lists best-selling products with details
+    - Columns: Product Name, Units Sold, Revenue, Growth %
+    
+    **5. Customer Acquisition (Area Chart)**
+    - Cumulative customer count over time
+    - Total customers: 15,432 (↑ 18% vs last year)
+    
+    **Key Insights:**
+    • Revenue is trending upward with strong Q4 performance
+    • North region dominates but South region needs attention
+    • Electronics category drives the most revenue
+    • Top 3 products account for 40% of total sales
+    
+    You can now interact with these charts, resize them, change types, or ask me to modify any visualization!
+    ```
+    
+    **STEP 5: CONVERSATIONAL DASHBOARD EDITING**
+    
+    Support these commands:
+    
+    • "Add a chart showing [metric]" → Create new visualization
+    • "Change [chart] to [type]" → Convert chart type
+    • "Show [time period] in [chart]" → Update time range
+    • "Make [chart] bigger" → Resize chart
+    • "Remove [chart]" → Delete visualization
+    • "Show top 10 instead of top 5" → Update data limit
+    • "Change colors to [scheme]" → Update color scheme
+    • "Compare [metric1] vs [metric2]" → Create comparison chart
+    
+    **DASHBOARD GENERATION BEST PRACTICES:**
+    
+    ✅ Always query real data from MongoDB (don't use fake data)
+    ✅ Choose chart types that match the data structure
+    ✅ Provide context and insights with each chart
+    ✅ Format data correctly for the chosen chart type
+    ✅ Suggest interactive features (filters, drill-downs)
+    ✅ Highlight anomalies, trends, and key findings
+    ✅ Keep dashboards focused (5-8 charts maximum)
+    ✅ Use consistent color schemes across related charts
+    
+    ❌ Don't create charts without real data
+    ❌ Don't use pie charts for >7 categories
+    ❌ Don't overcrowd dashboards with too many charts
+    ❌ Don't ignore time-series data (always show trends)
+    ❌ Don't forget to aggregate data appropriately
+    
+    **ADVANCED ANALYTICS FEATURES:**
+    
+    When appropriate, include:
+    • Trend lines and moving averages
+    • Period comparisons (YoY, MoM, WoW)
+    • Growth rates and percentage changes
+    • Outlier detection and highlighting
+    • Predictive insights (based on historical patterns)
+    • Drill-down suggestions for deeper analysis
+    
+    Remember: You're a data explorer - discover the structure, understand the data, provide insights, and visualize when helpful!
+    """
+)
+
+
+def get_query_strategy_guide() -> str:
+    """
+    Get the step-by-step strategy for compound, multi-collection queries
+    Use for questions that combine an entity lookup with extra conditions
+    """
+    return QUERY_STRATEGY_GUIDE
 
-    # Extract content as plain text
-    if hasattr(output, "content"):
-        reply = output.content
-    else:
-        reply = str(output)
 
-    logger.info("Agent reply length: %d characters", len(str(reply)))
-    return {"response": reply}
+def get_troubleshooting_guide() -> str:
+    """
+    Get the troubleshooting checklist for failed queries
+    Use when a query returns nothing, times out, or an entity cannot be found
+    """
+    return TROUBLESHOOTING_GUIDE
 
 
-@app.post("/dashboard/generate")
-async def generate_dashboard(req: DashboardGenerateRequest):
+def get_dashboard_guide() -> str:
     """
-    Generate a complete dashboard based on user query
-    The agent will analyze the database and create appropriate visualizations
+    Get the guide for building and editing interactive analytics dashboards
+    Use when the user asks to create, change, or extend a dashboard
     """
-    logger.info("/dashboard/generate called with query: %s", req.query)
-    
-    global agent
-    
-    if agent is None:
-        logger.error("Agent is not initialized")
-        return {"error": "Agent not initialized"}
-    
-    try:
-        # Enhanced prompt for dashboard generation
-        dashboard_prompt = f"""
-        Create an interactive analytics dashboard based on this request: {req.query}
+    return DASHBOARD_GUIDE
+
+
+# Per-endpoint prompts are parsed once at import; handlers only substitute the user fields.
+# Template uses $-placeholders, so the JSON examples need no brace escaping.
+DASHBOARD_PROMPT_TEMPLATE = Template("""
+        Create an interactive analytics dashboard based on this request: $query
         
         CRITICAL: You must provide actual data from the database in a parseable format.
         
@@ -787,9 +727,9 @@ async def generate_dashboard(req: DashboardGenerateRequest):
         **Chart Title: [Descriptive Title] (TYPE: [chart-type])**
         ```json
         [
-          {{"name": "Category 1", "value": 123}},
-          {{"name": "Category 2", "value": 456}},
-          {{"name": "Category 3", "value": 789}}
+          {"name": "Category 1", "value": 123},
+          {"name": "Category 2", "value": 456},
+          {"name": "Category 3", "value": 789}
         ]
         ```
         
@@ -804,21 +744,456 @@ async def generate_dashboard(req: DashboardGenerateRequest):
         
         **Monthly Revenue Trend (TYPE: line)**
         ```json
-        [{{"name": "Jan", "value": 45000}}, {{"name": "Feb", "value": 52000}}, {{"name": "Mar", "value": 48000}}]
+        [{"name": "Jan", "value": 45000}, {"name": "Feb", "value": 52000}, {"name": "Mar", "value": 48000}]
         ```
         
         **Department Distribution (TYPE: pie)**
         ```json
-        [{{"name": "Engineering", "value": 40}}, {{"name": "Sales", "value": 30}}, {{"name": "Marketing", "value": 30}}]
+        [{"name": "Engineering", "value": 40}, {"name": "Sales", "value": 30}, {"name": "Marketing", "value": 30}]
         ```
         
         **Top 5 Performers (TYPE: bar)**
         ```json
-        [{{"name": "Alice", "value": 95}}, {{"name": "Bob", "value": 88}}, {{"name": "Carol", "value": 85}}]
+        [{"name": "Alice", "value": 95}, {"name": "Bob", "value": 88}, {"name": "Carol", "value": 85}]
         ```
-        """
+        """)
+
+COMMAND_PROMPT_TEMPLATE = Template("""
+        $context
+        
+        User command: $command
+        
+        Interpret this command and execute it on the dashboard.
+        If it's about:
+        - Adding a chart: Analyze data and create appropriate visualization
+        - Modifying a chart: Identify the chart and suggest changes
+        - Removing a chart: Confirm which chart to remove
+        - Changing data: Query the database for updated data
+        
+        Provide a clear response about what action should be taken.
+        """)
+
+CHART_DATA_PROMPT_TEMPLATE = Template("""
+        Query: $query
+        Chart Type: $chart_type
+        
+        1. Execute the necessary MongoDB queries to get this data
+        2. Format the data appropriately for the chart type
+        3. Return the data in a structured format
         
-        output = await agent.arun(dashboard_prompt)
+        For most chart types, use format: [{"name": "Category", "value": 123}, ...]
+        For scatter plots, use: [{"x": 10, "y": 20}, ...]
+        For tables, return array of objects with all fields
+        """)
+
+
+def cache_key(*parts: str | None) -> str:
+    """Hash the case- and whitespace-normalized parts into a cache key"""
+    normalized = "|".join(" ".join((part or "").lower().split()) for part in parts)
+    return hashlib.blake2b(normalized.encode(), digest_size=16).hexdigest()
+
+
+def with_pool_options(connection_string: str | None) -> str | None:
+    """Add pool size options to the connection string unless already set"""
+    if not connection_string:
+        return connection_string
+
+    parts = urlsplit(connection_string)
+    options = parse_qsl(parts.query, keep_blank_values=True)
+    present = {key for key, _ in options}
+    options += [(key, value) for key, value in MONGO_POOL_OPTIONS.items() if key not in present]
+    return urlunsplit(parts._replace(path=parts.path or "/", query=urlencode(options)))
+
+
+async def warm_mongo_pool():
+    """Issue one cheap call through the MongoDB MCP server to open its first pooled connection"""
+    try:
+        await mcp_tools.session.call_tool("list-databases", {})
+        logger.info("MongoDB connection pool warmed")
+    except Exception:
+        logger.exception("Error while warming MongoDB connection pool")
+
+
+async def monitor_mcp_servers():
+    """Ping both MCP servers periodically and reconnect any that stop answering"""
+    while True:
+        await asyncio.sleep(MCP_HEALTH_INTERVAL_SECONDS)
+        for tools, name in ((mcp_tools, "MongoDB"), (chart_tools, "Chart")):
+            try:
+                # is_alive pings whichever session type agno holds and never raises itself
+                alive = await asyncio.wait_for(tools.is_alive(), MCP_PING_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                alive = False
+            if alive:
+                continue
+
+            logger.error("%s MCP server health check failed, reconnecting", name)
+            try:
+                await tools.close()
+            except Exception:
+                logger.exception("Error while closing unresponsive %s MCP server", name)
+            # connect() logs and swallows its own errors, so check the result explicitly
+            await tools.connect(force=True)
+            if tools.initialized:
+                logger.info("%s MCP server reconnected", name)
+            else:
+                logger.error("Reconnecting %s MCP server failed, retrying in %ds", name, MCP_HEALTH_INTERVAL_SECONDS)
+
+
+def start_background_task(coro):
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+
+
+async def connect_mcp_server(tools: MCPTools, name: str):
+    logger.info("Connecting %s MCP server at startup...", name)
+    await tools.connect()
+    logger.info("%s MCP server connected at startup", name)
+
+
+async def close_mcp_server(tools: MCPTools | None, name: str):
+    if tools is None:
+        return
+
+    logger.info("App shutdown: closing %s MCP server...", name)
+    try:
+        await tools.close()
+        logger.info("%s MCP server closed on shutdown", name)
+    except Exception:
+        logger.exception("Error while closing %s MCP server on shutdown", name)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global mcp_tools, chart_tools, agent
+
+    logger.info("App startup: initializing MCPTools and Agent")
+
+    connection_string = with_pool_options(settings.mdb_mcp_connection_string)
+
+    # MongoDB MCP Tools. A shared MCP sidecar lets several uvicorn workers reuse one
+    # server (and one Mongo pool) instead of each worker spawning its own npx subprocess
+    if settings.mdb_mcp_url:
+        mcp_tools = MCPTools(url=settings.mdb_mcp_url, transport="streamable-http", timeout_seconds=120)
+    else:
+        mcp_tools = MCPTools(
+            command="npx -y mongodb-mcp-server@latest",
+            env={"MDB_MCP_CONNECTION_STRING": connection_string},
+            timeout_seconds=120,
+        )
+    
+    # Chart MCP Tools for data visualization
+    if settings.chart_mcp_url:
+        chart_tools = MCPTools(url=settings.chart_mcp_url, transport="streamable-http", timeout_seconds=60)
+    else:
+        chart_tools = MCPTools(
+            command="npx -y @antv/mcp-server-chart",
+            timeout_seconds=60,
+        )
+
+    # connect() lists each server's tools once and registers them as functions;
+    # agent runs reuse those schemas, so no tools/list round trip happens per request.
+    # The two MCP servers are independent, so connect them concurrently
+    await asyncio.gather(
+        connect_mcp_server(mcp_tools, "MongoDB"),
+        connect_mcp_server(chart_tools, "Chart"),
+    )
+
+    # Warm the Mongo pool in the background so startup is not blocked
+    start_background_task(warm_mongo_pool())
+    start_background_task(monitor_mcp_servers())
+
+    # DO NOT reconstruct per request — handlers must reuse this instance
+    agent = Agent(
+        name="Intelligent MongoDB Analytics Assistant",
+        model=OpenAIChat(id="gpt-4.1-mini-2025-04-14", api_key=settings.openai_api_key),
+        tools=[
+            mcp_tools,
+            chart_tools,
+            get_query_strategy_guide,
+            get_troubleshooting_guide,
+            get_dashboard_guide,
+        ],
+        # Sent verbatim, so agno skips rebuilding the system message on every run
+        system_message=SYSTEM_INSTRUCTIONS,
+        debug_mode=settings.agent_debug,
+    )
+    logger.info("Intelligent MongoDB Analytics Assistant agent created at startup")
+
+    yield
+
+    for task in list(background_tasks):
+        task.cancel()
+    await asyncio.gather(
+        close_mcp_server(mcp_tools, "MongoDB"),
+        close_mcp_server(chart_tools, "Chart"),
+    )
+
+
+class OrjsonResponse(JSONResponse):
+    """
+    JSON response rendered with orjson
+    FastAPI's own ORJSONResponse is deprecated since 0.131 in favor of response models,
+    which these dict-returning routes do not declare
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+app = FastAPI(default_response_class=OrjsonResponse, lifespan=lifespan)
+
+# Allow frontend to access backend
+app.add_middleware(FastCORS)
+
+# Compress large agent/dashboard JSON responses
+app.add_middleware(GZipMiddleware, minimum_size=1000, compresslevel=5)
+
+
+@app.get("/")
+async def root():
+    return {"status": "MongoDB MCP AI Backend is running!"}
+
+async def run_agent(prompt: str):
+    """Run the agent with a per-call timeout, guarded by the circuit breaker"""
+    if not agent_breaker.allow():
+        raise HTTPException(status_code=503, detail="Agent temporarily unavailable, try again shortly")
+
+    try:
+        output = await asyncio.wait_for(agent.arun(prompt), AGENT_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        agent_breaker.record_failure()
+        logger.error("agent.arun timed out after %d seconds", AGENT_TIMEOUT_SECONDS)
+        raise HTTPException(status_code=504, detail="Agent timed out")
+    except Exception:
+        agent_breaker.record_failure()
+        raise
+
+    # agno reports model and tool failures as an errored run rather than raising
+    if getattr(output, "status", None) == RunStatus.error:
+        agent_breaker.record_failure()
+        logger.error("Agent run failed: %s", output.content)
+        raise HTTPException(status_code=502, detail=output.content or "Agent run failed")
+
+    agent_breaker.record_success()
+    return output
+
+
+async def run_chat(message: str) -> str:
+    """Answer one chat message, serving repeated queries from the response cache"""
+    key = cache_key(message)
+    cached = response_cache.get(key)
+    if cached is not None:
+        logger.info("Serving cached reply")
+        return cached
+
+    # Run agent (async)
+    logger.info("Running agent.arun")
+    try:
+        output = await run_agent(message)
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Error while running agent.arun")
+        raise
+
+    # Extract content as plain text
+    if hasattr(output, "content"):
+        reply = output.content
+    else:
+        reply = str(output)
+
+    logger.info("Agent reply length: %d characters", len(reply or ""))
+    # Only finished runs are answers; paused or cancelled runs must not be served again
+    if getattr(output, "status", None) == RunStatus.completed:
+        response_cache[key] = reply
+    return reply
+
+
+@app.post("/chat")
+async def chat(req: ChatRequest):
+
+    logger.info("/chat called")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Incoming message: %s", req.message[:LOG_PREVIEW_CHARS])
+
+    global agent
+
+    if agent is None:
+        logger.error("Agent is not initialized")
+        return {"error": "Agent not initialized"}
+
+    reply = await run_chat(req.message)
+    return {"response": reply}
+
+
+@app.post("/chat/batch")
+async def chat_batch(req: ChatBatchRequest):
+    """
+    Answer several chat messages in one round trip
+    Messages run concurrently, capped by batch_semaphore; a failed message
+    comes back as {"error": ...} in its slot
+    """
+    logger.info("/chat/batch called with %d messages", len(req.messages))
+
+    global agent
+
+    if agent is None:
+        logger.error("Agent is not initialized")
+        return {"error": "Agent not initialized"}
+
+    async def run_limited(message: str) -> str | dict:
+        async with batch_semaphore:
+            try:
+                return await run_chat(message)
+            except HTTPException as e:
+                return {"error": e.detail}
+            except Exception as e:
+                # One failed message should not discard the others' replies
+                return {"error": str(e) or type(e).__name__}
+
+    replies = await asyncio.gather(*(run_limited(message) for message in req.messages))
+    return {"responses": replies}
+
+
+def sse_event(payload: dict, event: str | None = None) -> bytes:
+    """Encode one Server-Sent Events message"""
+    prefix = f"event: {event}\n".encode() if event else b""
+    return prefix + b"data: " + orjson.dumps(payload) + b"\n\n"
+
+
+async def stream_agent(prompt: str, key: str | None = None, cache: TTLCache = response_cache):
+    """
+    Yield the agent reply as SSE token events, followed by a done event
+    When key is given, the reply is served from and stored in cache
+    """
+    if key is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            logger.info("Serving cached reply")
+            yield sse_event({"t": cached})
+            yield sse_event({}, event="done")
+            return
+
+    logger.info("Running agent.arun (stream)")
+    parts = []
+    try:
+        stream = agent.arun(prompt, stream=True)
+        # The whole run shares one deadline, like the non-streaming wait_for in run_agent
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + AGENT_TIMEOUT_SECONDS
+        chunks = aiter(stream)
+        while True:
+            try:
+                chunk = await asyncio.wait_for(anext(chunks), deadline - loop.time())
+            except StopAsyncIteration:
+                break
+            # Failures arrive as an error event rather than an exception
+            if isinstance(chunk, RunErrorEvent):
+                agent_breaker.record_failure()
+                logger.error("Streaming agent run failed: %s", chunk.content)
+                yield sse_event({"error": chunk.content or "Agent run failed"}, event="error")
+                return
+            # Only content events carry reply tokens
+            if not isinstance(chunk, RunContentEvent):
+                continue
+            content = chunk.content
+            if isinstance(content, str) and content:
+                parts.append(content)
+                yield sse_event({"t": content})
+    except asyncio.TimeoutError:
+        agent_breaker.record_failure()
+        logger.error("Streaming agent.arun timed out after %d seconds", AGENT_TIMEOUT_SECONDS)
+        yield sse_event({"error": "Agent timed out"}, event="error")
+        return
+    except Exception as e:
+        agent_breaker.record_failure()
+        logger.exception("Error while streaming agent.arun")
+        yield sse_event({"error": str(e)}, event="error")
+        return
+
+    agent_breaker.record_success()
+    reply = "".join(parts)
+    logger.info("Agent reply length: %d characters", len(reply))
+    if key is not None:
+        cache[key] = reply
+    yield sse_event({}, event="done")
+
+
+def stream_response(events) -> StreamingResponse:
+    """Wrap SSE events from stream_agent in a response, refusing up front while the circuit is open"""
+    if not agent_breaker.allow():
+        raise HTTPException(status_code=503, detail="Agent temporarily unavailable, try again shortly")
+
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        # identity keeps GZipMiddleware from buffering the token stream
+        headers={"Cache-Control": "no-cache", "Content-Encoding": "identity"},
+    )
+
+
+@app.post("/chat/stream")
+async def chat_stream(req: ChatRequest):
+    """
+    Stream the agent reply as Server-Sent Events
+    Each token arrives as `data: {"t": "..."}`; the stream ends with `event: done`
+    """
+    logger.info("/chat/stream called")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Incoming message: %s", req.message[:LOG_PREVIEW_CHARS])
+
+    global agent
+
+    if agent is None:
+        logger.error("Agent is not initialized")
+        return {"error": "Agent not initialized"}
+
+    return stream_response(stream_agent(req.message, cache_key(req.message)))
+
+
+def dashboard_prompt(query: str) -> str:
+    """Enhanced prompt for dashboard generation"""
+    return DASHBOARD_PROMPT_TEMPLATE.substitute(query=query)
+
+
+def command_prompt(req: DashboardCommandRequest) -> str:
+    """Prompt for executing a dashboard command against the current dashboard state"""
+    # Include current dashboard context in prompt
+    context = (
+        # exclude_unset keeps model defaults (None fields, 1x1 layout sizes) out of the prompt
+        f"Current dashboard state: {req.currentDashboard.model_dump(mode='json', exclude_unset=True)}"
+        if req.currentDashboard
+        else ""
+    )
+    return COMMAND_PROMPT_TEMPLATE.substitute(context=context, command=req.command)
+
+
+def chart_data_prompt(req: ChartDataRequest) -> str:
+    """Prompt for fetching the data behind a single chart"""
+    return CHART_DATA_PROMPT_TEMPLATE.substitute(
+        query=req.query, chart_type=req.chartType or "auto-detect best type"
+    )
+
+
+@app.post("/dashboard/generate")
+async def generate_dashboard(req: DashboardGenerateRequest):
+    """
+    Generate a complete dashboard based on user query
+    The agent will analyze the database and create appropriate visualizations
+    """
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("/dashboard/generate called with query: %s", req.query[:LOG_PREVIEW_CHARS])
+    
+    global agent
+    
+    if agent is None:
+        logger.error("Agent is not initialized")
+        return {"error": "Agent not initialized"}
+    
+    try:
+        output = await run_agent(dashboard_prompt(req.query))
         
         if hasattr(output, "content"):
             reply = output.content
@@ -832,18 +1207,37 @@ async def generate_dashboard(req: DashboardGenerateRequest):
             "message": "Dashboard analysis complete. Charts can be generated from the response."
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error generating dashboard")
         return {"error": str(e), "success": False}
 
 
+@app.post("/dashboard/generate/stream")
+async def generate_dashboard_stream(req: DashboardGenerateRequest):
+    """
+    Stream the dashboard analysis as Server-Sent Events
+    Same events as /chat/stream
+    """
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("/dashboard/generate/stream called with query: %s", req.query[:LOG_PREVIEW_CHARS])
+    
+    if agent is None:
+        logger.error("Agent is not initialized")
+        return {"error": "Agent not initialized"}
+    
+    return stream_response(stream_agent(dashboard_prompt(req.query)))
+
+
 @app.post("/dashboard/command")
 async def dashboard_command(req: DashboardCommandRequest):
     """
     Execute dashboard commands via chat
     Examples: "Add a pie chart", "Change bar chart to line", "Remove sales chart"
     """
-    logger.info("/dashboard/command called: %s", req.command)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("/dashboard/command called: %s", req.command[:LOG_PREVIEW_CHARS])
     
     global agent
     
@@ -851,25 +1245,7 @@ async def dashboard_command(req: DashboardCommandRequest):
         return {"error": "Agent not initialized"}
     
     try:
-        # Include current dashboard context in prompt
-        context = f"Current dashboard state: {req.currentDashboard}" if req.currentDashboard else ""
-        
-        command_prompt = f"""
-        {context}
-        
-        User command: {req.command}
-        
-        Interpret this command and execute it on the dashboard.
-        If it's about:
-        - Adding a chart: Analyze data and create appropriate visualization
-        - Modifying a chart: Identify the chart and suggest changes
-        - Removing a chart: Confirm which chart to remove
-        - Changing data: Query the database for updated data
-        
-        Provide a clear response about what action should be taken.
-        """
-        
-        output = await agent.arun(command_prompt)
+        output = await run_agent(command_prompt(req))
         
         if hasattr(output, "content"):
             reply = output.content
@@ -878,9 +1254,38 @@ async def dashboard_command(req: DashboardCommandRequest):
         
         return {"success": True, "response": reply}
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error executing dashboard command")
         return {"error": str(e), "success": False}
+    finally:
+        # Commands can add or change charts, so cached chart data may be stale. Clearing once
+        # the command is over also drops chart data that was fetched while it ran.
+        chart_data_cache.clear()
+
+
+@app.post("/dashboard/command/stream")
+async def dashboard_command_stream(req: DashboardCommandRequest):
+    """
+    Stream the reply to a dashboard command as Server-Sent Events
+    Same events as /chat/stream
+    """
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("/dashboard/command/stream called: %s", req.command[:LOG_PREVIEW_CHARS])
+    
+    if agent is None:
+        return {"error": "Agent not initialized"}
+    
+    async def events():
+        try:
+            async for event in stream_agent(command_prompt(req)):
+                yield event
+        finally:
+            # Cleared once the command is over, so chart data fetched meanwhile is dropped too
+            chart_data_cache.clear()
+    
+    return stream_response(events())
 
 
 @app.post("/dashboard/chart-data")
@@ -888,36 +1293,74 @@ async def get_chart_data(req: ChartDataRequest):
     """
     Fetch data for a specific chart based on query
     """
-    logger.info("/dashboard/chart-data called for query: %s", req.query)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("/dashboard/chart-data called for query: %s", req.query[:LOG_PREVIEW_CHARS])
     
     global agent
     
     if agent is None:
         return {"error": "Agent not initialized"}
     
+    key = cache_key(req.query, req.chartType)
+    cached = chart_data_cache.get(key)
+    if cached is not None:
+        logger.info("Serving cached chart data")
+        return {"success": True, "data": cached}
+    
     try:
-        data_prompt = f"""
-        Query: {req.query}
-        Chart Type: {req.chartType or 'auto-detect best type'}
-        
-        1. Execute the necessary MongoDB queries to get this data
-        2. Format the data appropriately for the chart type
-        3. Return the data in a structured format
-        
-        For most chart types, use format: [{{"name": "Category", "value": 123}}, ...]
-        For scatter plots, use: [{{"x": 10, "y": 20}}, ...]
-        For tables, return array of objects with all fields
-        """
-        
-        output = await agent.arun(data_prompt)
-        
-        if hasattr(output, "content"):
-            reply = output.content
-        else:
-            reply = str(output)
+        async with chart_data_locks.setdefault(key, asyncio.Lock()):
+            # Another request may have filled the cache while this one waited
+            cached = chart_data_cache.get(key)
+            if cached is not None:
+                return {"success": True, "data": cached}
+            
+            output = await run_agent(chart_data_prompt(req))
+            
+            if hasattr(output, "content"):
+                reply = output.content
+            else:
+                reply = str(output)
+            
+            if getattr(output, "status", None) == RunStatus.completed:
+                chart_data_cache[key] = reply
         
         return {"success": True, "data": reply}
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error fetching chart data")
         return {"error": str(e), "success": False}
+
+
+@app.post("/dashboard/chart-data/stream")
+async def get_chart_data_stream(req: ChartDataRequest):
+    """
+    Stream chart data as Server-Sent Events
+    Same events as /chat/stream
+    """
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("/dashboard/chart-data/stream called for query: %s", req.query[:LOG_PREVIEW_CHARS])
+    
+    if agent is None:
+        return {"error": "Agent not initialized"}
+    
+    return stream_response(
+        stream_agent(chart_data_prompt(req), cache_key(req.query, req.chartType), chart_data_cache)
+    )
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # "auto" picks the uvloop event loop and httptools parser whenever they are installed
+    # (uvicorn[standard] on Linux/macOS), and falls back to asyncio/h11 elsewhere, e.g. Windows
+    uvicorn.run(
+        "app:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="auto",
+        http="auto",
+        # Keep idle connections open so the chatty dashboard UI reuses them
+        timeout_keep_alive=75,
+    )
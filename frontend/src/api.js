@@ -1,5 +1,5 @@
 export async function sendMessage(message, onChunk) {
-  const response = await fetch("http://127.0.0.1:8000/chat", {
+  const response = await fetch("http://127.0.0.1:8000/chat/stream", {
     method: "POST",
     headers: {
       "Content-Type": "application/json",
@@ -13,11 +13,35 @@ export async function sendMessage(message, onChunk) {
     return;
   }
 
-  // Expect a JSON response: { response: "...text..." }
-  const data = await response.json();
-  const text = typeof data === "object" && data !== null && "response" in data
-    ? data.response
-    : String(data);
+  // Expect Server-Sent Events: `data: {"t": "...token..."}` per chunk, then `event: done`
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
 
-  onChunk(text);
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+
+    buffer += decoder.decode(value, { stream: true });
+    const events = buffer.split("\n\n");
+    buffer = events.pop();
+
+    for (const raw of events) {
+      let event = "message";
+      let data = "";
+      for (const line of raw.split("\n")) {
+        if (line.startsWith("event: ")) event = line.slice(7);
+        else if (line.startsWith("data: ")) data += line.slice(6);
+      }
+
+      if (event === "done") return;
+
+      const payload = data ? JSON.parse(data) : {};
+      if (event === "error") {
+        onChunk("⚠️ " + (payload.error || "Agent error"));
+        return;
+      }
+      if (payload.t) onChunk(payload.t);
+    }
+  }
 }
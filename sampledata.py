@@ -9,20 +9,34 @@ This script generates and inserts dummy employee performance data including:
 - Department metrics
 """
 
+import os
+import asyncio
 import pymongo
+from pymongo import IndexModel
 from datetime import datetime, timedelta
-import random
+from functools import partial
+from itertools import islice
+from multiprocessing import Pool
+import numpy as np
 from faker import Faker
 
 # Initialize Faker for generating realistic dummy data
 fake = Faker()
 
+# One NumPy generator for every random draw; pool workers reseed their copy in seed_worker
+SEED = 42
+RNG = np.random.default_rng(SEED)
+
 # MongoDB connection string
 MONGO_URI = ""
 DATABASE_NAME = "employee_performance_db"
 
-# Connect to MongoDB
-client = pymongo.MongoClient(MONGO_URI)
+# Connect to MongoDB (w=1 without journaling is enough for throwaway seed data).
+# The generated documents are highly repetitive, so wire compression cuts the bytes sent;
+# the server picks the first compressor in the list that it also supports.
+client = pymongo.AsyncMongoClient(
+    MONGO_URI, w=1, journal=False, compressors="zstd,snappy,zlib", zlibCompressionLevel=3
+)
 db = client[DATABASE_NAME]
 
 # Collections
@@ -32,19 +46,152 @@ payroll_collection = db["payroll"]
 performance_kpis_collection = db["performance_kpis"]
 departments_collection = db["departments"]
 
+# Attendance statuses and how often each occurs
+ATTENDANCE_STATUSES = ["Present", "Absent", "Late", "Half-day", "Leave"]
+ATTENDANCE_WEIGHTS = [0.85, 0.05, 0.03, 0.02, 0.05]
+STATUS_PRESENT, STATUS_ABSENT, STATUS_LATE, STATUS_HALF_DAY, STATUS_LEAVE = range(5)
+
+# Per-status bounds, indexed by status code:
+# check-in hour lo/hi, check-out hour lo/hi (inclusive), base hours worked, +/- hours noise
+STATUS_TABLE = np.array([
+    [8, 9, 17, 19, 8, 1],    # Present
+    [0, 0, 0, 0, 0, 0],      # Absent
+    [10, 11, 17, 19, 7, 1],  # Late
+    [8, 9, 12, 14, 4, 0],    # Half-day
+    [0, 0, 0, 0, 0, 0],      # Leave
+])
+
+# Faker values are generated once into pools and sampled per record, since Faker's
+# provider dispatch dominates the cost of building documents
+FAKER_POOL_SIZE = 200
+FIRST_NAMES = [fake.first_name() for _ in range(FAKER_POOL_SIZE)]
+LAST_NAMES = [fake.last_name() for _ in range(FAKER_POOL_SIZE)]
+PERSON_NAMES = [fake.name() for _ in range(FAKER_POOL_SIZE)]
+PHONE_NUMBERS = [fake.phone_number() for _ in range(FAKER_POOL_SIZE)]
+# Address and emergency contact sub-documents are built once and shared between employees
+ADDRESS_POOL = [
+    {
+        "street": fake.street_address(),
+        "city": fake.city(),
+        "state": fake.state(),
+        "zip_code": fake.zipcode()
+    }
+    for _ in range(50)
+]
+EMERGENCY_CONTACT_POOL = [
+    {
+        "name": fake.name(),
+        "relationship": relationship,
+        "phone": fake.phone_number()
+    }
+    for relationship in RNG.choice(["Spouse", "Parent", "Sibling"], 50).tolist()
+]
+COMMENT_POOL = [fake.paragraph() for _ in range(50)]
+# Absence/leave notes
+NOTE_POOL = [fake.sentence() for _ in range(50)]
+
+# KPI metric names and the uniform range each score is drawn from
+KPI_METRICS = [
+    "productivity_score", "quality_score", "attendance_score",
+    "teamwork_score", "communication_score", "innovation_score",
+]
+KPI_METRIC_LOW = np.array([60, 65, 70, 60, 65, 50])
+KPI_METRIC_HIGH = np.full(len(KPI_METRICS), 100)
+KPI_STRENGTHS = [
+    "Strong technical skills",
+    "Excellent communication",
+    "Great team player",
+    "Problem-solving ability",
+    "Leadership qualities"
+]
+KPI_IMPROVEMENT_AREAS = [
+    "Time management",
+    "Documentation",
+    "Meeting deadlines",
+    "Attention to detail",
+    "Proactive communication"
+]
+
+HOUR = np.timedelta64(1, "h")
+MINUTE = np.timedelta64(1, "m")
+
+# Documents per insert_many call when streaming generated records
+BATCH_SIZE = 5000
+
+# Max insert_many calls in flight at once
+INSERT_CONCURRENCY = 8
+insert_slots = asyncio.Semaphore(INSERT_CONCURRENCY)
+
+
+async def insert_batch(collection, batch):
+    try:
+        await collection.insert_many(batch, ordered=False, bypass_document_validation=True)
+    finally:
+        insert_slots.release()
+    return len(batch)
+
+
+async def insert_in_batches(collection, documents, batch_size=BATCH_SIZE):
+    """Insert documents from any iterable in concurrent unordered batches, returning the count inserted"""
+    documents = iter(documents)
+    tasks = []
+    while batch := list(islice(documents, batch_size)):
+        # Waiting for a free slot before building the next batch bounds memory use
+        await insert_slots.acquire()
+        tasks.append(asyncio.create_task(insert_batch(collection, batch)))
+    return sum(await asyncio.gather(*tasks))
+
+
+def seed_worker():
+    """Give each worker process its own random stream instead of the copy inherited from the parent"""
+    global RNG
+    RNG = np.random.default_rng([SEED, os.getpid()])
+
+
+def sample_pool(pool, size):
+    """Draw size items from pool with replacement, as a list of the original objects"""
+    return [pool[i] for i in RNG.integers(0, len(pool), size)]
+
+
+def collect_records(employees, builder, **kwargs):
+    """Worker entry point: build one employee chunk's records as a list"""
+    return list(builder(employees, **kwargs))
 
-def clear_existing_data():
+
+async def insert_from_pool(pool, collection, builder, employees, **kwargs):
+    """Build records across the pool, one employee chunk per task, inserting batches as they finish"""
+    num_chunks = os.cpu_count() or 1
+    chunks = [employees[i::num_chunks] for i in range(num_chunks) if employees[i::num_chunks]]
+    task = partial(collect_records, builder=builder, **kwargs)
+    results = pool.imap_unordered(task, chunks)
+
+    # Waiting on the pool happens in a thread so inserts for other collections keep running
+    loop = asyncio.get_running_loop()
+    inserted = 0
+    while (batch := await loop.run_in_executor(None, next, results, None)) is not None:
+        inserted += await insert_in_batches(collection, batch)
+    return inserted
+
+
+def is_weekday(days):
+    """Mask of Monday-Friday entries in a datetime64[D] array (1970-01-01 was a Thursday)"""
+    return (days.astype("int64") + 3) % 7 < 5
+
+
+async def clear_existing_data():
     """Clear existing data from all collections"""
     print("Clearing existing data...")
-    employees_collection.delete_many({})
-    attendance_collection.delete_many({})
-    payroll_collection.delete_many({})
-    performance_kpis_collection.delete_many({})
-    departments_collection.delete_many({})
+    await asyncio.gather(
+        employees_collection.delete_many({}),
+        attendance_collection.delete_many({}),
+        payroll_collection.delete_many({}),
+        performance_kpis_collection.delete_many({}),
+        departments_collection.delete_many({}),
+    )
     print("✓ Existing data cleared")
 
 
-def generate_departments():
+async def generate_departments():
     """Generate department data"""
     print("\nGenerating departments...")
     
@@ -91,12 +238,12 @@ def generate_departments():
         }
     ]
     
-    result = departments_collection.insert_many(departments)
-    print(f"✓ Inserted {len(result.inserted_ids)} departments")
+    count = await insert_in_batches(departments_collection, departments)
+    print(f"✓ Inserted {count} departments")
     return departments
 
 
-def generate_employees(num_employees=100):
+async def generate_employees(num_employees=100):
     """Generate employee data"""
     print(f"\nGenerating {num_employees} employees...")
     
@@ -107,267 +254,333 @@ def generate_employees(num_employees=100):
         "HR Specialist", "Accountant", "Financial Analyst", "Product Manager"
     ]
     
+    # Hire dates fall within the last 5 years, at midnight for MongoDB compatibility
+    today = datetime.combine(datetime.now().date(), datetime.min.time())
+    
+    # Every random field is drawn for all employees at once
+    columns = zip(
+        RNG.integers(0, 5 * 365 + 1, num_employees).tolist(),
+        sample_pool(FIRST_NAMES, num_employees),
+        sample_pool(LAST_NAMES, num_employees),
+        sample_pool(PHONE_NUMBERS, num_employees),
+        sample_pool(departments, num_employees),
+        sample_pool(positions, num_employees),
+        RNG.integers(40000, 150001, num_employees).tolist(),
+        RNG.choice(["Active", "On Leave"], num_employees, p=[0.8, 0.2]).tolist(),
+        sample_pool(ADDRESS_POOL, num_employees),
+        sample_pool(EMERGENCY_CONTACT_POOL, num_employees),
+    )
+    
     employees = []
-    for i in range(num_employees):
-        # Convert date to datetime for MongoDB compatibility
-        hire_date = fake.date_between(start_date="-5y", end_date="today")
-        hire_datetime = datetime.combine(hire_date, datetime.min.time())
-        
+    for i, (hire_days, first_name, last_name, phone, department_id, position, salary, status, address, contact) in enumerate(columns):
         employee = {
             "employee_id": f"EMP{str(i+1).zfill(4)}",
-            "first_name": fake.first_name(),
-            "last_name": fake.last_name(),
-            "email": fake.email(),
-            "phone": fake.phone_number(),
-            "department_id": random.choice(departments),
-            "position": random.choice(positions),
-            "hire_date": hire_datetime,
-            "salary": random.randint(40000, 150000),
-            "status": random.choice(["Active", "Active", "Active", "Active", "On Leave"]),
-            "address": {
-                "street": fake.street_address(),
-                "city": fake.city(),
-                "state": fake.state(),
-                "zip_code": fake.zipcode()
-            },
-            "emergency_contact": {
-                "name": fake.name(),
-                "relationship": random.choice(["Spouse", "Parent", "Sibling"]),
-                "phone": fake.phone_number()
-            }
+            "first_name": first_name,
+            "last_name": last_name,
+            # The index suffix keeps emails unique for the unique email index
+            "email": f"{first_name}.{last_name}{i + 1}@example.com".lower(),
+            "phone": phone,
+            "department_id": department_id,
+            "position": position,
+            "hire_date": today - timedelta(days=hire_days),
+            "salary": salary,
+            "status": status,
+            "address": address,
+            "emergency_contact": contact
         }
         employees.append(employee)
     
-    result = employees_collection.insert_many(employees)
-    print(f"✓ Inserted {len(result.inserted_ids)} employees")
+    count = await insert_in_batches(employees_collection, employees)
+    print(f"✓ Inserted {count} employees")
     return employees
 
 
-def generate_attendance_records(employees, num_months=6):
+async def generate_attendance_records(pool, employees, num_months=6):
     """Generate attendance records for the last N months"""
     print(f"\nGenerating attendance records for last {num_months} months...")
     
-    attendance_records = []
-    today = datetime.now()
-    
-    for employee in employees:
-        # Generate records for each working day in the last N months
-        for month_offset in range(num_months):
-            current_date = today - timedelta(days=30 * month_offset)
-            days_in_month = 22  # Average working days
-            
-            for day in range(days_in_month):
-                record_date = current_date - timedelta(days=day)
-                
-                # Skip weekends
-                if record_date.weekday() >= 5:
-                    continue
-                
-                # Random attendance status
-                status_weights = [0.85, 0.05, 0.03, 0.02, 0.05]  # Present, Absent, Late, Half-day, Leave
-                status = random.choices(
-                    ["Present", "Absent", "Late", "Half-day", "Leave"],
-                    weights=status_weights
-                )[0]
-                
-                # Generate check-in and check-out times
-                if status == "Present":
-                    check_in = record_date.replace(hour=random.randint(8, 9), minute=random.randint(0, 59))
-                    check_out = record_date.replace(hour=random.randint(17, 19), minute=random.randint(0, 59))
-                    hours_worked = 8 + random.uniform(-1, 1)
-                elif status == "Late":
-                    check_in = record_date.replace(hour=random.randint(10, 11), minute=random.randint(0, 59))
-                    check_out = record_date.replace(hour=random.randint(17, 19), minute=random.randint(0, 59))
-                    hours_worked = 7 + random.uniform(-1, 1)
-                elif status == "Half-day":
-                    check_in = record_date.replace(hour=random.randint(8, 9), minute=random.randint(0, 59))
-                    check_out = record_date.replace(hour=random.randint(12, 14), minute=random.randint(0, 59))
-                    hours_worked = 4
-                else:
-                    check_in = None
-                    check_out = None
-                    hours_worked = 0
-                
-                record = {
-                    "employee_id": employee["employee_id"],
-                    "date": record_date,
-                    "status": status,
-                    "check_in": check_in,
-                    "check_out": check_out,
-                    "hours_worked": round(hours_worked, 2),
-                    "notes": fake.sentence() if status in ["Absent", "Leave"] else None
-                }
-                attendance_records.append(record)
-    
-    result = attendance_collection.insert_many(attendance_records)
-    print(f"✓ Inserted {len(result.inserted_ids)} attendance records")
+    count = await insert_from_pool(pool, attendance_collection, iter_attendance_records, employees, num_months=num_months)
+    print(f"✓ Inserted {count} attendance records")
+
+
+def iter_attendance_records(employees, num_months):
+    """Yield attendance records, drawing all random values as NumPy arrays up front"""
+    now = np.datetime64(datetime.now(), "us")
+
+    # Working days: 22 days back from each 30-day month anchor, weekends removed
+    day_offsets = (30 * np.arange(num_months)[:, None] + np.arange(22)).ravel()
+    dates = now - day_offsets * np.timedelta64(1, "D")
+    days = dates.astype("datetime64[D]")
+    dates, days = dates[is_weekday(days)], days[is_weekday(days)]
+
+    num_days = len(dates)
+    n = len(employees) * num_days
+    dates = np.tile(dates, len(employees))
+    # check_in/check_out keep the current seconds, as datetime.replace(hour, minute) did
+    day_starts = np.tile(days, len(employees)) + (now - now.astype("datetime64[m]"))
+
+    status = RNG.choice(len(ATTENDANCE_STATUSES), size=n, p=ATTENDANCE_WEIGHTS)
+    absent = np.isin(status, (STATUS_ABSENT, STATUS_LEAVE))
+    in_lo, in_hi, out_lo, out_hi, base_hours, noise = STATUS_TABLE[status].T
 
+    check_in = day_starts + RNG.integers(in_lo, in_hi + 1) * HOUR + RNG.integers(0, 60, n) * MINUTE
+    check_out = day_starts + RNG.integers(out_lo, out_hi + 1) * HOUR + RNG.integers(0, 60, n) * MINUTE
+    # NaT converts to None, so absent days get no check-in/out
+    check_in = np.where(absent, np.datetime64("NaT"), check_in)
+    check_out = np.where(absent, np.datetime64("NaT"), check_out)
 
-def generate_payroll_records(employees, num_months=6):
+    hours_worked = (base_hours + noise * RNG.uniform(-1, 1, n)).round(2)
+    notes = np.where(absent, np.array(NOTE_POOL, dtype=object)[RNG.integers(0, len(NOTE_POOL), n)], None)
+
+    # Convert to Python objects once, then assemble the documents
+    employee_ids = np.repeat([employee["employee_id"] for employee in employees], num_days).tolist()
+    statuses = np.array(ATTENDANCE_STATUSES)[status].tolist()
+    columns = zip(
+        employee_ids, dates.tolist(), statuses, check_in.tolist(), check_out.tolist(),
+        hours_worked.tolist(), notes.tolist(),
+    )
+
+    for employee_id, date, status_name, checked_in, checked_out, hours, note in columns:
+        yield {
+            "employee_id": employee_id,
+            "date": date,
+            "status": status_name,
+            "check_in": checked_in,
+            "check_out": checked_out,
+            "hours_worked": hours,
+            "notes": note
+        }
+
+
+async def generate_payroll_records(pool, employees, num_months=6):
     """Generate payroll records"""
     print(f"\nGenerating payroll records for last {num_months} months...")
     
-    payroll_records = []
+    count = await insert_from_pool(pool, payroll_collection, iter_payroll_records, employees, num_months=num_months)
+    print(f"✓ Inserted {count} payroll records")
+
+
+def iter_payroll_records(employees, num_months):
+    """Yield payroll records, computing every amount as a NumPy array up front"""
     today = datetime.now()
+    # Pay dates and periods are the same for every employee, so compute them once
+    pay_dates = [today - timedelta(days=30 * month_offset) for month_offset in range(num_months)]
+    pay_periods = [(pay_date, pay_date.replace(day=1), pay_date.replace(day=28)) for pay_date in pay_dates]
     
-    for employee in employees:
-        monthly_salary = employee["salary"] / 12
-        
-        for month_offset in range(num_months):
-            pay_date = today - timedelta(days=30 * month_offset)
-            pay_period_start = pay_date.replace(day=1)
-            pay_period_end = pay_date.replace(day=28)
-            
-            # Calculate deductions and bonuses
-            tax = monthly_salary * 0.15
-            insurance = random.uniform(200, 500)
-            retirement = monthly_salary * 0.05
-            bonus = random.uniform(0, 1000) if random.random() > 0.7 else 0
-            overtime_pay = random.uniform(0, 500) if random.random() > 0.6 else 0
-            
-            gross_pay = monthly_salary + bonus + overtime_pay
-            total_deductions = tax + insurance + retirement
-            net_pay = gross_pay - total_deductions
-            
-            record = {
-                "employee_id": employee["employee_id"],
-                "pay_period_start": pay_period_start,
-                "pay_period_end": pay_period_end,
-                "pay_date": pay_date,
-                "base_salary": round(monthly_salary, 2),
-                "overtime_pay": round(overtime_pay, 2),
-                "bonus": round(bonus, 2),
-                "gross_pay": round(gross_pay, 2),
-                "deductions": {
-                    "tax": round(tax, 2),
-                    "insurance": round(insurance, 2),
-                    "retirement": round(retirement, 2),
-                    "total": round(total_deductions, 2)
-                },
-                "net_pay": round(net_pay, 2),
-                "payment_method": random.choice(["Direct Deposit", "Check"]),
-                "status": "Paid"
-            }
-            payroll_records.append(record)
+    # One row per (employee, month), employee-major like the original nested loops
+    monthly_salary = np.repeat([employee["salary"] / 12 for employee in employees], num_months)
+    n = len(monthly_salary)
+    
+    # Calculate deductions and bonuses
+    tax = monthly_salary * 0.15
+    insurance = RNG.uniform(200, 500, n)
+    retirement = monthly_salary * 0.05
+    bonus = np.where(RNG.random(n) > 0.7, RNG.uniform(0, 1000, n), 0)
+    overtime_pay = np.where(RNG.random(n) > 0.6, RNG.uniform(0, 500, n), 0)
+    
+    gross_pay = monthly_salary + bonus + overtime_pay
+    total_deductions = tax + insurance + retirement
+    net_pay = gross_pay - total_deductions
     
-    result = payroll_collection.insert_many(payroll_records)
-    print(f"✓ Inserted {len(result.inserted_ids)} payroll records")
+    columns = zip(
+        np.repeat([employee["employee_id"] for employee in employees], num_months).tolist(),
+        pay_periods * len(employees),
+        *(values.round(2).tolist() for values in (
+            monthly_salary, overtime_pay, bonus, gross_pay, tax, insurance, retirement, total_deductions, net_pay,
+        )),
+        RNG.choice(["Direct Deposit", "Check"], n).tolist(),
+    )
+    
+    for (employee_id, (pay_date, pay_period_start, pay_period_end), base_salary, overtime, bonus_pay, gross,
+         tax_paid, insurance_paid, retirement_paid, deductions, net, payment_method) in columns:
+        record = {
+            "employee_id": employee_id,
+            "pay_period_start": pay_period_start,
+            "pay_period_end": pay_period_end,
+            "pay_date": pay_date,
+            "base_salary": base_salary,
+            "overtime_pay": overtime,
+            "bonus": bonus_pay,
+            "gross_pay": gross,
+            "deductions": {
+                "tax": tax_paid,
+                "insurance": insurance_paid,
+                "retirement": retirement_paid,
+                "total": deductions
+            },
+            "net_pay": net,
+            "payment_method": payment_method,
+            "status": "Paid"
+        }
+        yield record
 
 
-def generate_performance_kpis(employees):
+async def generate_performance_kpis(pool, employees):
     """Generate performance KPI data"""
     print("\nGenerating performance KPIs...")
     
-    kpi_records = []
+    count = await insert_from_pool(pool, performance_kpis_collection, iter_performance_kpis, employees)
+    print(f"✓ Inserted {count} performance KPI records")
+
+
+def iter_performance_kpis(employees):
+    """Yield quarterly performance KPI records one at a time"""
     today = datetime.now()
+    review_dates = [today - timedelta(days=90 * quarter) for quarter in range(4)]
+    n = len(employees) * 4
+    
+    # All metric scores in one (records, metrics) draw; overall score is the row mean
+    scores = RNG.uniform(KPI_METRIC_LOW, KPI_METRIC_HIGH, (n, len(KPI_METRICS))).round(2)
+    overall_scores = scores.mean(axis=1).round(2).tolist()
+    scores = scores.tolist()
     
-    for employee in employees:
+    goals_achieved = RNG.integers(3, 11, n).tolist()
+    projects_completed = RNG.integers(2, 9, n).tolist()
+    customer_satisfaction = RNG.uniform(3.5, 5.0, n).round(1).tolist()
+    # Peer, manager and overall ratings
+    ratings = RNG.uniform(3.0, 5.0, (n, 3)).round(1).tolist()
+    strengths = np.array(KPI_STRENGTHS)[RNG.integers(0, len(KPI_STRENGTHS), (n, 2))].tolist()
+    areas_for_improvement = np.array(KPI_IMPROVEMENT_AREAS)[RNG.integers(0, len(KPI_IMPROVEMENT_AREAS), (n, 2))].tolist()
+    comments = sample_pool(COMMENT_POOL, n)
+    reviewers = sample_pool(PERSON_NAMES, n)
+    
+    # Per-quarter templates hold the fields shared by every employee, in document order;
+    # each record is a C-level copy with only the varying fields filled in
+    templates = [
+        {
+            "employee_id": None,
+            "review_date": review_date,
+            "quarter": f"Q{4 - quarter}",
+            "year": review_date.year,
+            "metrics": None,
+            "goals_achieved": None,
+            "goals_total": 10,
+            "projects_completed": None,
+            "customer_satisfaction": None,
+            "peer_rating": None,
+            "manager_rating": None,
+            "overall_rating": None,
+            "strengths": None,
+            "areas_for_improvement": None,
+            "comments": None,
+            "reviewer": None,
+            "overall_score": None
+        }
+        for quarter, review_date in enumerate(review_dates)
+    ]
+    
+    for i, employee in enumerate(employees):
         # Generate quarterly KPIs
-        for quarter in range(4):
-            review_date = today - timedelta(days=90 * quarter)
+        for quarter, template in enumerate(templates):
+            row = 4 * i + quarter
             
-            record = {
-                "employee_id": employee["employee_id"],
-                "review_date": review_date,
-                "quarter": f"Q{4 - quarter}",
-                "year": review_date.year,
-                "metrics": {
-                    "productivity_score": round(random.uniform(60, 100), 2),
-                    "quality_score": round(random.uniform(65, 100), 2),
-                    "attendance_score": round(random.uniform(70, 100), 2),
-                    "teamwork_score": round(random.uniform(60, 100), 2),
-                    "communication_score": round(random.uniform(65, 100), 2),
-                    "innovation_score": round(random.uniform(50, 100), 2)
-                },
-                "goals_achieved": random.randint(3, 10),
-                "goals_total": 10,
-                "projects_completed": random.randint(2, 8),
-                "customer_satisfaction": round(random.uniform(3.5, 5.0), 1),
-                "peer_rating": round(random.uniform(3.0, 5.0), 1),
-                "manager_rating": round(random.uniform(3.0, 5.0), 1),
-                "overall_rating": round(random.uniform(3.0, 5.0), 1),
-                "strengths": [
-                    random.choice([
-                        "Strong technical skills",
-                        "Excellent communication",
-                        "Great team player",
-                        "Problem-solving ability",
-                        "Leadership qualities"
-                    ]) for _ in range(2)
-                ],
-                "areas_for_improvement": [
-                    random.choice([
-                        "Time management",
-                        "Documentation",
-                        "Meeting deadlines",
-                        "Attention to detail",
-                        "Proactive communication"
-                    ]) for _ in range(2)
-                ],
-                "comments": fake.paragraph(),
-                "reviewer": fake.name()
-            }
+            record = template.copy()
+            record["employee_id"] = employee["employee_id"]
+            record["metrics"] = dict(zip(KPI_METRICS, scores[row]))
+            record["goals_achieved"] = goals_achieved[row]
+            record["projects_completed"] = projects_completed[row]
+            record["customer_satisfaction"] = customer_satisfaction[row]
+            record["peer_rating"], record["manager_rating"], record["overall_rating"] = ratings[row]
+            record["strengths"] = strengths[row]
+            record["areas_for_improvement"] = areas_for_improvement[row]
+            record["comments"] = comments[row]
+            record["reviewer"] = reviewers[row]
+            record["overall_score"] = overall_scores[row]
             
-            # Calculate overall score
-            metrics = record["metrics"]
-            overall_score = sum(metrics.values()) / len(metrics)
-            record["overall_score"] = round(overall_score, 2)
-            
-            kpi_records.append(record)
-    
-    result = performance_kpis_collection.insert_many(kpi_records)
-    print(f"✓ Inserted {len(result.inserted_ids)} performance KPI records")
+            yield record
 
 
-def create_indexes():
+async def create_indexes():
     """Create indexes for better query performance"""
     print("\nCreating indexes...")
     
-    # Employee indexes
-    employees_collection.create_index("employee_id", unique=True)
-    employees_collection.create_index("department_id")
-    employees_collection.create_index("email", unique=True)
-    
-    # Attendance indexes
-    attendance_collection.create_index([("employee_id", 1), ("date", -1)])
-    attendance_collection.create_index("date")
-    
-    # Payroll indexes
-    payroll_collection.create_index([("employee_id", 1), ("pay_date", -1)])
-    payroll_collection.create_index("pay_date")
-    
-    # Performance KPI indexes
-    performance_kpis_collection.create_index([("employee_id", 1), ("review_date", -1)])
-    performance_kpis_collection.create_index([("year", 1), ("quarter", 1)])
-    
-    # Department indexes
-    departments_collection.create_index("department_id", unique=True)
+    # One createIndexes command per collection, with the collections built concurrently
+    await asyncio.gather(
+        # Employee indexes
+        employees_collection.create_indexes([
+            IndexModel("employee_id", unique=True),
+            IndexModel("department_id"),
+            IndexModel("email", unique=True),
+        ]),
+        
+        # Attendance indexes
+        attendance_collection.create_indexes([
+            IndexModel([("employee_id", 1), ("date", -1)]),
+            IndexModel("date"),
+        ]),
+        
+        # Payroll indexes
+        payroll_collection.create_indexes([
+            IndexModel([("employee_id", 1), ("pay_date", -1)]),
+            IndexModel("pay_date"),
+        ]),
+        
+        # Performance KPI indexes
+        performance_kpis_collection.create_indexes([
+            IndexModel([("employee_id", 1), ("review_date", -1)]),
+            IndexModel([("year", 1), ("quarter", 1)]),
+        ]),
+        
+        # Department indexes
+        departments_collection.create_indexes([
+            IndexModel("department_id", unique=True),
+        ]),
+    )
     
     print("✓ Indexes created")
 
 
-def print_summary():
+def facet_values(facets):
+    """Flatten a $facet result of single {'n': value} documents, with 0 for empty facets"""
+    return {name: docs[0]['n'] if docs else 0 for name, docs in facets.items()}
+
+
+async def print_summary():
     """Print summary of inserted data"""
+    # Unfiltered totals come from collection metadata instead of a scan;
+    # one $facet round trip per collection covers all employee/attendance stats
+    departments, payroll, kpis, employee_cursor, attendance_cursor = await asyncio.gather(
+        departments_collection.estimated_document_count(),
+        payroll_collection.estimated_document_count(),
+        performance_kpis_collection.estimated_document_count(),
+        employees_collection.aggregate([{'$facet': {
+            'total': [{'$count': 'n'}],
+            'active': [{'$match': {'status': 'Active'}}, {'$count': 'n'}],
+            'avg_salary': [{'$group': {'_id': None, 'n': {'$avg': '$salary'}}}],
+        }}]),
+        attendance_collection.aggregate([{'$facet': {
+            'total': [{'$count': 'n'}],
+            'present': [{'$match': {'status': 'Present'}}, {'$count': 'n'}],
+            'absent': [{'$match': {'status': 'Absent'}}, {'$count': 'n'}],
+        }}]),
+    )
+    employee_stats = facet_values(await employee_cursor.next())
+    attendance_stats = facet_values(await attendance_cursor.next())
+    employees, active, average_salary = (
+        employee_stats['total'], employee_stats['active'], employee_stats['avg_salary']
+    )
+    attendance, total_present, total_absent = (
+        attendance_stats['total'], attendance_stats['present'], attendance_stats['absent']
+    )
+
     print("\n" + "="*60)
     print("DATA INSERTION SUMMARY")
     print("="*60)
     print(f"Database: {DATABASE_NAME}")
-    print(f"Departments: {departments_collection.count_documents({})}")
-    print(f"Employees: {employees_collection.count_documents({})}")
-    print(f"Attendance Records: {attendance_collection.count_documents({})}")
-    print(f"Payroll Records: {payroll_collection.count_documents({})}")
-    print(f"Performance KPIs: {performance_kpis_collection.count_documents({})}")
+    print(f"Departments: {departments}")
+    print(f"Employees: {employees}")
+    print(f"Attendance Records: {attendance}")
+    print(f"Payroll Records: {payroll}")
+    print(f"Performance KPIs: {kpis}")
     print("="*60)
     
     # Sample queries
     print("\nSample Statistics:")
-    print(f"- Active Employees: {employees_collection.count_documents({'status': 'Active'})}")
-    print(f"- Average Salary: ${employees_collection.aggregate([{'$group': {'_id': None, 'avg': {'$avg': '$salary'}}}]).next()['avg']:,.2f}")
+    print(f"- Active Employees: {active}")
+    print(f"- Average Salary: ${average_salary:,.2f}")
     
     # Attendance stats
-    total_present = attendance_collection.count_documents({"status": "Present"})
-    total_absent = attendance_collection.count_documents({"status": "Absent"})
-    total_records = attendance_collection.count_documents({})
+    total_records = attendance
     if total_records > 0:
         print(f"- Attendance Rate: {(total_present / total_records * 100):.2f}%")
         print(f"- Absence Rate: {(total_absent / total_records * 100):.2f}%")
@@ -375,7 +588,7 @@ def print_summary():
     print("\n✓ Data insertion completed successfully!")
 
 
-def main():
+async def main():
     """Main function to generate all sample data"""
     print("="*60)
     print("EMPLOYEE PERFORMANCE DATA GENERATOR")
@@ -383,28 +596,32 @@ def main():
     
     try:
         # Clear existing data
-        clear_existing_data()
+        await clear_existing_data()
         
         # Generate data
-        generate_departments()
-        employees = generate_employees(num_employees=100)
-        generate_attendance_records(employees, num_months=6)
-        generate_payroll_records(employees, num_months=6)
-        generate_performance_kpis(employees)
+        await generate_departments()
+        employees = await generate_employees(num_employees=100)
+        # Build records across CPU cores while this process overlaps the inserts
+        with Pool(initializer=seed_worker) as pool:
+            await asyncio.gather(
+                generate_attendance_records(pool, employees, num_months=6),
+                generate_payroll_records(pool, employees, num_months=6),
+                generate_performance_kpis(pool, employees),
+            )
         
         # Create indexes
-        create_indexes()
+        await create_indexes()
         
         # Print summary
-        print_summary()
+        await print_summary()
         
     except Exception as e:
         print(f"\n❌ Error: {e}")
         raise
     finally:
-        client.close()
+        await client.close()
         print("\n✓ Database connection closed")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file